@@ -1,27 +1,68 @@
 import re
 import time
+import hashlib
 import certifi
 import urllib3
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, urljoin, quote
-import pandas as pd
 from bs4 import BeautifulSoup
-from transformers import pipeline
+from utils.company_record import CompanyRecord, frame_to_records, records_to_frame
+from utils.decoding import decode_bytes, decode_pdf_text, response_text
+from utils.domain_cache import DomainCache, canonical_domain
+from utils.embedded_data import MAX_ENDPOINT_BYTES, extract_embedded
+from utils.profiling import PROFILER
+from utils.registry_index import RegistryIndex
+from utils.site_crawler import crawl_site, read_limited
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Files
-INPUT_FILE = Path(r"ddata\interim\agencies_merged.csv")
-OUTPUT_FILE = Path(r"data\interim\agencies_merged_with_inn_ogrn.csv")
+INPUT_FILE = Path("data/interim/agencies_merged.csv")
+OUTPUT_FILE = Path("data/interim/agencies_merged_with_inn_ogrn.csv")
+# Optional local registry index (see src/utils/registry_index.py); crawl only on misses
+REGISTRY_INDEX = Path("data/registry/egrul_index.sqlite")
+# Per-domain memo of crawl results: duplicate sites (www/paths/utm) are crawled once
+DOMAIN_CACHE_FILE = Path("data/interim/domain_cache.json")
+# Sites processed in parallel; concurrent rows of one domain wait for a single crawl
+MAX_WORKERS = 1
+# Fields that come from the company's own site and are shared by all rows of a domain
+SITE_FIELDS = (
+    "inn", "ogrn", "full_name", "region", "address", "contacts", "email",
+    "revenue_year", "doc_url", "doc_type",
+)
 
-# Local NER model (English)
-NER_MODEL_PATH = r"src\utils\nermodel"
-ner = pipeline("ner", model=NER_MODEL_PATH, grouped_entities=True)
+# Per-site crawl budget for contacts/requisites pages beyond the homepage
+CRAWL_MAX_PAGES = 4
+CRAWL_MAX_BYTES = 3_000_000
+
+# PDF fetch limits: skip non-PDF / oversized responses, use Range for head + trailer
+PDF_MAX_BYTES = 2_000_000        # full download limit (as before)
+PDF_SKIP_BYTES = 20_000_000      # larger files without Range support are skipped
+PDF_HEAD_BYTES = 1_000_000       # first pages
+PDF_TAIL_BYTES = 64 * 1024       # trailer / xref
+PDF_DIGEST_BY_URL = {}           # url -> sha1 of fetched bytes
+PDF_PARSED_BY_DIGEST = {}        # sha1 -> parsed fields (identical PDFs across sites)
+
+# Local NER model (English); transformers/torch are imported on first use only
+NER_MODEL_PATH = str(Path(__file__).resolve().parent / "utils" / "nermodel")
+_ner = None
+
+def get_ner():
+    global _ner
+    if _ner is None:
+        from transformers import pipeline
+        _ner = pipeline("ner", model=NER_MODEL_PATH, grouped_entities=True)
+    return _ner
 
 # Regexes
 RE_INN = re.compile(r"\b\d{10}\b|\b\d{12}\b")
 RE_OGRN = re.compile(r"\b\d{13}\b")
+# Same patterns on raw bytes: digits are ASCII in utf-8/cp1251, no decoding needed
+RE_INN_B = re.compile(rb"\b\d{10}\b|\b\d{12}\b")
+RE_OGRN_B = re.compile(rb"\b\d{13}\b")
+RE_PDF_URL_B = re.compile(rb"https?://[^\s\"'<>]+\.pdf")
 RE_COMPANY = re.compile(r"(?:ООО|ОАО|ЗАО|ПАО|ИП)\s+[\"«]?[A-Za-zА-Яа-яЁё0-9\s\-\.\,]+[\"»]?", re.U)
 
 RE_EMAIL = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
@@ -39,16 +80,26 @@ RE_REVENUE_YEAR = re.compile(
     r"(?:за\s)?(?:(?:\b20\d{2}\b)|(?:\b19\d{2}\b))(?=\s*г(?:\.|ода)?)"
 )
 
+# HTTP settings; module-level so src/loadtest.py can tune them against the mock web
+HTTP_TIMEOUT = 20        # seconds per request (connect/read)
+PDF_TIMEOUT = 45         # PDF downloads and Range requests
+SMALL_FETCH_TIMEOUT = 10 # optional JSON endpoints (fetch_small_text)
+HTTP_RETRIES = 2         # urllib3 retries on 429/5xx per session
+HTTP_BACKOFF = 1.0       # urllib3 backoff_factor
+UA_RETRY_SLEEP = 1.0     # pause before retrying robust_get with the next User-Agent
+
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_5_1) Safari/605.1.15",
     "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Firefox/121.0",
 ]
 
-def build_session(ua_idx=0, verify=True, timeout=20):
+def build_session(ua_idx=0, verify=True, timeout=20, retries=None):
+    """retries=None -> HTTP_RETRIES; 0 for optional requests that should fail fast."""
     sess = requests.Session()
     retries = urllib3.util.retry.Retry(
-        total=2, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504]
+        total=HTTP_RETRIES if retries is None else retries, backoff_factor=HTTP_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
     )
     adapter = requests.adapters.HTTPAdapter(max_retries=retries)
     sess.mount("http://", adapter)
@@ -58,7 +109,9 @@ def build_session(ua_idx=0, verify=True, timeout=20):
     sess.verify = certifi.where() if verify else False
     return sess
 
-def robust_get(url, timeout=20, stream=False):
+@PROFILER.timed("fetch")
+def robust_get(url, timeout=None, stream=False):
+    timeout = timeout or HTTP_TIMEOUT
     url = quote(url, safe=":/?&=%")
     for ua_idx in range(len(USER_AGENTS)):
         try:
@@ -68,9 +121,34 @@ def robust_get(url, timeout=20, stream=False):
             return r
         except Exception as e:
             print(f"[WARN] fetch fail UA#{ua_idx} {url}: {e}")
-            time.sleep(1.0)
+            time.sleep(UA_RETRY_SLEEP)
     return None
 
+@PROFILER.timed("fetch")
+def fetch_small_text(url, max_bytes, timeout=None):
+    """
+    One GET with the first UA, no UA fallback and no urllib3 retries, for
+    optional resources; None if missing/too big.
+    """
+    timeout = timeout or SMALL_FETCH_TIMEOUT
+    try:
+        sess = build_session(0, verify=True, timeout=timeout, retries=0)
+        r = sess.get(quote(url, safe=":/?&=%"), timeout=timeout, stream=True)
+    except Exception as e:
+        print(f"[WARN] fetch fail {url}: {e}")
+        return None
+    with r:
+        if r.status_code >= 400 or int(r.headers.get("Content-Length") or 0) > max_bytes:
+            return None
+        content = b""
+        for chunk in r.iter_content(chunk_size=1024 * 64):
+            content += chunk
+            if len(content) > max_bytes:
+                return None
+    text, _ = decode_bytes(content, r.headers.get("Content-Type", ""), urlparse(r.url).hostname or "")
+    return text
+
+@PROFILER.timed("parse")
 def extract_text(html):
     try:
         soup = BeautifulSoup(html, "html.parser")
@@ -78,6 +156,7 @@ def extract_text(html):
     except Exception:
         return ""
 
+@PROFILER.timed("regex")
 def find_inn_ogrn_in_text(text):
     inns = RE_INN.findall(text or "")
     ogrns = RE_OGRN.findall(text or "")
@@ -85,6 +164,15 @@ def find_inn_ogrn_in_text(text):
     ogrn = ogrns[0] if ogrns else ""
     return inn, ogrn
 
+@PROFILER.timed("regex")
+def find_inn_ogrn_in_bytes(content):
+    inns = RE_INN_B.findall(content or b"")
+    ogrns = RE_OGRN_B.findall(content or b"")
+    inn = inns[0].decode("ascii") if inns else ""
+    ogrn = ogrns[0].decode("ascii") if ogrns else ""
+    return inn, ogrn
+
+@PROFILER.timed("regex")
 def find_company_name(text):
     if not text:
         return ""
@@ -101,6 +189,7 @@ def find_company_name(text):
         return m2.group(0).strip()
     return ""
 
+@PROFILER.timed("regex")
 def extract_contacts(text):
     txt = text or ""
     emails = RE_EMAIL.findall(txt)
@@ -113,6 +202,7 @@ def extract_contacts(text):
     email = "; ".join(sorted(set(emails))) if emails else ""
     return region, address, contacts, email
 
+@PROFILER.timed("regex")
 def parse_revenue_year(text):
     txt = text or ""
     m = RE_REVENUE_YEAR.search(txt)
@@ -132,26 +222,107 @@ def gather_pdf_links_from_dom(soup, base_root):
             links.append(href)
     return list(set(links))
 
-def parse_pdf_to_text(url):
-    r = robust_get(url, timeout=45, stream=True)
+@PROFILER.timed("fetch")
+def robust_head(url, timeout=None):
+    """HEAD with the first UA only; many servers reject HEAD, so None just means 'unknown'."""
+    timeout = timeout or HTTP_TIMEOUT
+    url = quote(url, safe=":/?&=%")
+    try:
+        sess = build_session(0, verify=True, timeout=timeout)
+        r = sess.head(url, timeout=timeout, allow_redirects=True)
+        if r.status_code >= 400:
+            return None
+        return r
+    except Exception as e:
+        print(f"[WARN] HEAD fail {url}: {e}")
+        return None
+
+def pdf_headers_ok(headers):
+    """Reject HTML error pages / images served under .pdf links and huge files."""
+    ctype = headers.get("Content-Type", "").lower()
+    if ctype and not any(t in ctype for t in ("pdf", "octet-stream", "binary")):
+        return False
+    length = int(headers.get("Content-Length") or 0)
+    ranges = headers.get("Accept-Ranges", "").lower() == "bytes"
+    return not (length > PDF_SKIP_BYTES and not ranges)
+
+@PROFILER.timed("fetch")
+def fetch_range(url, start, end, timeout=None):
+    """
+    Single Range GET; returns bytes only on a real 206 Partial Content.
+    Streamed: a server that ignores Range and sends the whole file (200)
+    is dropped after the headers, and a 206 is read up to the range size.
+    """
+    timeout = timeout or PDF_TIMEOUT
+    size = end - start + 1
+    try:
+        sess = build_session(0, verify=True, timeout=timeout)
+        with sess.get(quote(url, safe=":/?&=%"), timeout=timeout, stream=True,
+                      headers={"Range": f"bytes={start}-{end}"}) as r:
+            if r.status_code == 206:
+                return read_limited(r, size)[:size]
+    except Exception as e:
+        print(f"[WARN] range fetch fail {url}: {e}")
+    return None
+
+@PROFILER.timed("fetch")
+def fetch_pdf_bytes(url):
+    """
+    HEAD first: skip non-PDF or oversized responses. If the server supports
+    Range and the file is large, fetch only the first pages plus the
+    trailer/xref; otherwise stream up to PDF_MAX_BYTES.
+    """
+    h = robust_head(url)
+    if h is not None:
+        if not pdf_headers_ok(h.headers):
+            print(f"   [SKIP] не PDF или слишком большой: {url}")
+            return b""
+        length = int(h.headers.get("Content-Length") or 0)
+        ranges = h.headers.get("Accept-Ranges", "").lower() == "bytes"
+        if ranges and length > PDF_HEAD_BYTES + PDF_TAIL_BYTES:
+            head = fetch_range(url, 0, PDF_HEAD_BYTES - 1)
+            if head is not None:
+                if b"%PDF" not in head[:1024]:
+                    return b""
+                tail = fetch_range(url, length - PDF_TAIL_BYTES, length - 1)
+                if tail is not None:
+                    return head + tail
+
+    r = robust_get(url, timeout=PDF_TIMEOUT, stream=True)
     if not r:
-        return ""
+        return b""
+    # HEAD may be unsupported: check the GET headers before reading the body
+    if not pdf_headers_ok(r.headers):
+        print(f"   [SKIP] не PDF или слишком большой: {url}")
+        r.close()
+        return b""
     content = b""
     # Stream up to 2MB to avoid huge downloads
     for chunk in r.iter_content(chunk_size=1024 * 64):
         content += chunk
-        if len(content) > 2_000_000:
+        if len(content) > PDF_MAX_BYTES:
             break
+    r.close()
+    if b"%PDF" not in content[:1024]:
+        return b""
+    return content
+
+@PROFILER.timed("parse")
+def decode_pdf_bytes(content):
     # Try simple decode (heuristic). For more reliable text, integrate pdfminer or PyMuPDF.
     try:
-        return content.decode("latin-1", errors="ignore")
+        return decode_pdf_text(content)
     except Exception:
         return ""
 
+def parse_pdf_to_text(url):
+    return decode_pdf_bytes(fetch_pdf_bytes(url))
+
+@PROFILER.timed("ner")
 def ner_extract(text):
     # Use NER to supplement regex extraction; still confirm via regex to reduce noise
     try:
-        entities = ner(text or "")
+        entities = get_ner()(text or "")
     except Exception as e:
             print(f"[WARN] NER failed: {e}")
             return "", "", ""
@@ -170,31 +341,33 @@ def ner_extract(text):
 
 def fetch_homepage_and_text(site):
     root = f"{urlparse(site).scheme}://{urlparse(site).netloc}/"
-    r = robust_get(root, timeout=20)
+    r = robust_get(root)
     if not r:
         return "", "", None, root
-    text = extract_text(r.text)
-    soup = BeautifulSoup(r.text, "html.parser")
-    return text, r.text, soup, root
+    with PROFILER.span("parse"):
+        html = response_text(r)
+        text = extract_text(html)
+        soup = BeautifulSoup(html, "html.parser")
+    return text, html, soup, root
 
-def search_all_pdfs(root, soup):
+def search_all_pdfs(root, soups):
     pdf_links = []
-    # From DOM
-    if soup:
+    # From DOM of every fetched page
+    for soup in soups:
         pdf_links.extend(gather_pdf_links_from_dom(soup, root))
     # From sitemap.xml
     sitemap_url = urljoin(root, "sitemap.xml")
-    r2 = robust_get(sitemap_url, timeout=20)
+    r2 = robust_get(sitemap_url)
     if r2:
-        sm_text = r2.text
-        pdfs = re.findall(r"https?://[^\s\"']+\.pdf", sm_text)
-        pdf_links.extend(pdfs)
+        # URLs are ASCII: scan the raw sitemap bytes instead of decoding it
+        pdfs = RE_PDF_URL_B.findall(r2.content)
+        pdf_links.extend(u.decode("ascii", errors="ignore") for u in pdfs)
     return list(dict.fromkeys(pdf_links))  # unique, preserve order
 
-def parse_fields_from_html(text, prefer_if_missing=True, current=None):
+def parse_fields_from_html(text, prefer_if_missing=True, current=None, origin="homepage"):
     """
-    Extract fields from HTML text. If prefer_if_missing=True and current dict has
-    empty fields, fill them; otherwise, keep existing values.
+    Extract fields from HTML text. If prefer_if_missing=True and a CompanyRecord
+    is given, fill its empty fields; otherwise return the parsed dict.
     """
     inn_h, ogrn_h = find_inn_ogrn_in_text(text)
     company_h = find_company_name(text)
@@ -213,18 +386,15 @@ def parse_fields_from_html(text, prefer_if_missing=True, current=None):
         "doc_url": "",
         "doc_type": "homepage",
     }
-    if prefer_if_missing and current:
-        for k, v in result.items():
-            if not str(current.get(k, "")).strip() and v:
-                current[k] = v
-        return current
+    if prefer_if_missing and current is not None:
+        return current.merge(result, origin=origin)
     return result
 
-def parse_fields_from_pdf(url, current=None):
-    pdf_text = parse_pdf_to_text(url)
-    if not pdf_text:
-        return current or {}
-    inn_p, ogrn_p = find_inn_ogrn_in_text(pdf_text)
+def parse_pdf_fields(pdf_text, content=None):
+    if content is not None:
+        inn_p, ogrn_p = find_inn_ogrn_in_bytes(content)
+    else:
+        inn_p, ogrn_p = find_inn_ogrn_in_text(pdf_text)
     company_p = find_company_name(pdf_text)
     # Supplement with NER (heuristic)
     inn_n, ogrn_n, company_n = ner_extract(pdf_text)
@@ -234,7 +404,7 @@ def parse_fields_from_pdf(url, current=None):
     region_p, address_p, contacts_p, email_p = extract_contacts(pdf_text)
     rev_year_p = parse_revenue_year(pdf_text)
 
-    parsed = {
+    return {
         "inn": inn_final,
         "ogrn": ogrn_final,
         "full_name": company_final,
@@ -243,92 +413,171 @@ def parse_fields_from_pdf(url, current=None):
         "contacts": contacts_p,
         "email": email_p,
         "revenue_year": rev_year_p,
-        "doc_url": url,
-        "doc_type": "pdf",
     }
-    if current:
-        for k, v in parsed.items():
-            if not str(current.get(k, "")).strip() and v:
-                current[k] = v
+
+def parse_fields_from_pdf(url, current=None):
+    # Same URL linked from several sites: reuse the digest, do not download again
+    digest = PDF_DIGEST_BY_URL.get(url)
+    if digest is None:
+        content = fetch_pdf_bytes(url)
+        if not content:
+            return current or {}
+        digest = hashlib.sha1(content).hexdigest()
+        PDF_DIGEST_BY_URL[url] = digest
+        # Identical PDF under another URL: skip regex/NER, reuse parsed fields
+        if digest not in PDF_PARSED_BY_DIGEST:
+            pdf_text = decode_pdf_bytes(content)
+            if not pdf_text:
+                return current or {}
+            PDF_PARSED_BY_DIGEST[digest] = parse_pdf_fields(pdf_text, content)
+    parsed = dict(PDF_PARSED_BY_DIGEST.get(digest, {}), doc_url=url, doc_type="pdf")
+    if current is not None:
         # Prefer doc_url/doc_type if we actually found any main fields
-        if (parsed["inn"] or parsed["ogrn"] or parsed["full_name"]) and parsed["doc_url"]:
-            current["doc_url"] = parsed["doc_url"]
-            current["doc_type"] = parsed["doc_type"]
-        return current
+        found_main = parsed.get("inn") or parsed.get("ogrn") or parsed.get("full_name")
+        overwrite = ("doc_url", "doc_type") if found_main else ()
+        return current.merge(parsed, origin=url, overwrite=overwrite)
     return parsed
 
-def process_site(row, col_order):
-    site = str(row.get("site", "")).strip()
-    if not site:
-        return row
-
-    # Build a mutable record of parsed fields, seeded with existing values (do not overwrite)
-    current = {
-        "inn": str(row.get("inn", "")).strip(),
-        "ogrn": str(row.get("ogrn", "")).strip(),
-        "full_name": str(row.get("full_name", "")).strip(),
-        "region": str(row.get("region", "")).strip(),
-        "address": str(row.get("address", "")).strip(),
-        "contacts": str(row.get("contacts", "")).strip(),
-        "email": str(row.get("email", "")).strip(),
-        "revenue_year": str(row.get("revenue_year", "")).strip(),
-        "revenue": str(row.get("revenue", "")).strip(),
-        "doc_url": str(row.get("doc_url", "")).strip(),
-        "doc_type": str(row.get("doc_type", "")).strip(),
+def lookup_registry(registry, record):
+    """
+    Resolve INN/OGRN from the local registry index by site/name/region.
+    Returns dict of fields to fill or None on miss.
+    """
+    hit = registry.resolve(name=record.name, region=record.region, site=record.site)
+    if not hit:
+        return None
+    return {
+        "inn": hit["inn"],
+        "ogrn": hit["ogrn"],
+        "full_name": hit["full_name"] or hit["short_name"],
+        "region": hit["region"],
+        "address": hit["address"],
+        "doc_url": "",
+        "doc_type": "registry",
     }
 
+def has_requisites(current):
+    return current.filled("inn") and current.filled("ogrn")
+
+def parse_embedded_data(soup, html, page_url, root, current, fetch_endpoints=False):
+    """
+    JS-rendered sites: mine __NEXT_DATA__ / JSON-LD / microdata / window.__STATE__
+    (and, on the homepage, a few same-site JSON endpoints) before crawling or PDFs.
+    """
+    if soup is None:
+        return current
+    had_inn = current.filled("inn")
+    with PROFILER.span("parse"):
+        fields, text = extract_embedded(
+            soup, html, page_url, root,
+            fetch=(lambda u: fetch_small_text(u, MAX_ENDPOINT_BYTES)) if fetch_endpoints else None,
+            done=lambda f: bool(f.get("inn")) and bool(f.get("ogrn") or current.filled("ogrn")),
+        )
+    if fields:
+        current.merge(fields, origin=f"embedded:{page_url}")
+    if text:
+        # Only contacts from free text: ids/timestamps in app state look like INN/OGRN,
+        # so requisites come solely from key-matched fields above
+        region, address, contacts, email = extract_contacts(text)
+        current.merge({"region": region, "address": address, "contacts": contacts, "email": email},
+                      origin=f"embedded:{page_url}")
+    if not had_inn and current.filled("inn"):
+        current.merge({"doc_url": page_url, "doc_type": "embedded"}, origin=page_url,
+                      overwrite=("doc_url", "doc_type"))
+    return current
+
+def crawl_requisites_pages(root, soup, current):
+    """
+    Bounded priority crawl over same-domain links (contacts/about/requisites first).
+    Stops as soon as INN and OGRN are known. Returns soups of all fetched pages.
+    """
+    soups = [soup] if soup else []
+    pages = crawl_site(
+        root,
+        lambda u: robust_get(u, stream=True),
+        start_soup=soup,
+        max_pages=CRAWL_MAX_PAGES,
+        max_bytes=CRAWL_MAX_BYTES,
+        stop=lambda: has_requisites(current),
+    )
+    for url, page_html, page_soup in pages:
+        print(f"   [CRAWL] {url}")
+        had_inn = current.filled("inn")
+        with PROFILER.span("parse"):
+            page_text = page_soup.get_text(" ", strip=True)
+        parse_fields_from_html(page_text, current=current, origin=url)
+        if not has_requisites(current):
+            parse_embedded_data(page_soup, page_html, url, root, current)
+        if not had_inn and current.filled("inn"):
+            current.merge({"doc_url": url, "doc_type": "html"}, origin=url,
+                          overwrite=("doc_url", "doc_type"))
+        soups.append(page_soup)
+    return current, soups
+
+def process_site(current):
+    """
+    Enrich a CompanyRecord in place. Existing values are never overwritten;
+    name/site/segment_tag/source are source metadata and stay as-is.
+    """
+    site = str(current.site).strip()
+    if not site:
+        return current
+
     print(f"[INFO] Обрабатываю сайт: {site}")
 
     # 1) Homepage HTML
     text, html_raw, soup, root = fetch_homepage_and_text(site)
     if text:
-        current = parse_fields_from_html(text, prefer_if_missing=True, current=current)
+        parse_fields_from_html(text, prefer_if_missing=True, current=current)
 
-    # 2) All PDFs from site (DOM + sitemap.xml)
-    pdf_links = search_all_pdfs(root, soup)
+    # 2) Data embedded for client-side rendering (JSON-LD, __NEXT_DATA__, small JSON APIs)
+    if not has_requisites(current):
+        parse_embedded_data(soup, html_raw, root, root, current, fetch_endpoints=True)
+
+    # 3) Contacts/requisites pages found via the homepage link graph
+    current, soups = crawl_requisites_pages(root, soup, current)
+
+    # 4) PDFs (DOM of fetched pages + sitemap.xml) only if requisites are still missing
+    pdf_links = search_all_pdfs(root, soups) if not has_requisites(current) else []
     if pdf_links:
         print(f"   [INFO] Найдено PDF: {len(pdf_links)}")
     for link in pdf_links:
-        current = parse_fields_from_pdf(link, current=current)
+        parse_fields_from_pdf(link, current=current)
+        if has_requisites(current):
+            break
 
-    # Final assembly: keep original metadata from source file
-    # name, site, segment_tag, source come from input as-is
-    current["name"] = row.get("name", "")
-    current["site"] = site
-    current["segment_tag"] = row.get("segment_tag", "")
-    current["source"] = row.get("source", "")
-    # revenue: leave as-is if provided; otherwise keep parsed or empty
-    current["revenue"] = row.get("revenue", current["revenue"])
+    return current
 
-    # Order columns and set back to row
-    for col in col_order:
-        row[col] = current.get(col, row.get(col, ""))
+def enrich_site(site):
+    """Crawl a site from scratch and return the site-derived fields (cacheable per domain)."""
+    with PROFILER.site(canonical_domain(site)):
+        rec = process_site(CompanyRecord(site=site))
+    return {k: getattr(rec, k) for k in SITE_FIELDS if rec.filled(k)}
 
-    return row
+def enrich_record(record, cache):
+    """Fill a record from its domain's crawl result; returns True if it came from the cache."""
+    domain = canonical_domain(record.site)
+    found, cached = cache.get_or_compute(domain, lambda: enrich_site(record.site))
+    record.merge(found, origin=f"site:{domain}")
+    return cached
 
 def main():
-    # Load input
-    df = pd.read_csv(INPUT_FILE, encoding="utf-8")
+    import pandas as pd
+
+    # Load input (as text: INN/OGRN must not become floats)
+    df = pd.read_csv(INPUT_FILE, encoding="utf-8", dtype=str, keep_default_na=False)
 
     # Resume mode: if output exists, continue from it (preserve parsed progress)
     if OUTPUT_FILE.exists():
-        prev = pd.read_csv(OUTPUT_FILE, encoding="utf-8")
+        prev = pd.read_csv(OUTPUT_FILE, encoding="utf-8", dtype=str, keep_default_na=False)
         # Align columns and merge by index
         df = prev.reindex(columns=list(prev.columns)) \
                  .combine_first(df) \
                  .fillna("")
         print(f"[INFO] Продолжаем с существующего файла: {len(df)} строк.")
 
-    # Ensure required columns exist
-    required_cols = [
-        "inn", "ogrn", "name", "full_name", "site",
-        "region", "address", "contacts", "email",
-        "revenue_year", "revenue", "segment_tag", "source",
-        "doc_url", "doc_type",
-    ]
-    for col in required_cols:
-        if col not in df.columns:
-            df[col] = ""
+    # DataFrame only at the I/O boundary; missing columns become empty record fields
+    records = frame_to_records(df, origin="input")
 
     # Column order exactly as requested
     col_order = [
@@ -338,38 +587,74 @@ def main():
         "doc_url", "doc_type",
     ]
 
-    total = len(df)
+    registry = None
+    if REGISTRY_INDEX.exists():
+        try:
+            registry = RegistryIndex(REGISTRY_INDEX)
+            print(f"[INFO] Используем локальный индекс реестра: {REGISTRY_INDEX}")
+        except Exception as e:
+            print(f"[WARN] Индекс реестра не открыт ({REGISTRY_INDEX}): {e}")
+
+    cache = DomainCache(DOMAIN_CACHE_FILE)
+
+    def save():
+        records_to_frame(records, col_order).to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
+        cache.save()
+
+    total = len(records)
     print(f"[INFO] Начинаем обработку {total} сайтов...")
 
-    for idx, row in df.iterrows():
-        site = str(row.get("site", "")).strip()
+    todo = []
+    for idx, record in enumerate(records):
+        site = str(record.site).strip()
         if not site:
             continue
 
         # Skip already parsed rows if inn/ogrn/full_name present and contacts/email/address/region/revenue_year filled
         already = (
-            (str(row.get("inn", "")).strip() or str(row.get("ogrn", "")).strip() or str(row.get("full_name", "")).strip())
-            and (str(row.get("contacts", "")).strip() or str(row.get("email", "")).strip()
-                 or str(row.get("address", "")).strip() or str(row.get("region", "")).strip())
+            any(record.filled(c) for c in ("inn", "ogrn", "full_name"))
+            and any(record.filled(c) for c in ("contacts", "email", "address", "region"))
         )
         if already:
             continue
 
-        try:
-            updated_row = process_site(row, col_order)
-            for c in col_order:
-                df.at[idx, c] = updated_row[c]
-            # Save after each processed site
-            df[col_order].to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
-            print(f"   [SAVE] {OUTPUT_FILE} обновлён (строка {idx+1})")
-        except Exception as e:
-            print(f"[ERROR] Ошибка обработки {site}: {e}")
-            # Save progress even on error
-            df[col_order].to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
+        # Local registry first: microseconds instead of a multi-second crawl
+        if registry:
+            try:
+                hit = lookup_registry(registry, record)
+            except Exception as e:
+                # an index error is a miss, not the end of the run
+                print(f"[WARN] Индекс реестра, {site}: {e}")
+                hit = None
+            if hit:
+                record.merge(hit, origin="registry", overwrite=("doc_type",))
+                print(f"   [REGISTRY] {site}: ИНН {hit['inn']}")
+                continue
+
+        todo.append((idx, record))
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = {pool.submit(enrich_record, record, cache): (idx, record) for idx, record in todo}
+        for fut in as_completed(futures):
+            idx, record = futures[fut]
+            try:
+                if fut.result():
+                    print(f"   [CACHE] {record.site}: результат домена {canonical_domain(record.site)}")
+                # Save after each processed site
+                with PROFILER.span("save", site=canonical_domain(record.site)):
+                    save()
+                print(f"   [SAVE] {OUTPUT_FILE} обновлён (строка {idx+1})")
+            except Exception as e:
+                print(f"[ERROR] Ошибка обработки {record.site}: {e}")
+                # Save progress even on error
+                save()
+
+    if registry:
+        registry.close()
 
     # Final save ensuring column order
-    df[col_order].to_csv(OUTPUT_FILE, index=False, encoding="utf-8")
-    print(f"[INFO] Готово! Сохранено {len(df)} строк в {OUTPUT_FILE}")
+    save()
+    print(f"[INFO] Готово! Сохранено {len(records)} строк в {OUTPUT_FILE}")
 
 if __name__ == "__main__":
     main()
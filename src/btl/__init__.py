@@ -0,0 +1,6 @@
+"""
+Единая точка входа пайплайна: python -m btl <команда>.
+
+Пакет намеренно лёгкий: pandas, bs4, transformers/torch импортируются
+только внутри той подкоманды, которой они нужны.
+"""
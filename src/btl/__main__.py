@@ -0,0 +1,3 @@
+from btl.cli import main
+
+main()
@@ -0,0 +1,212 @@
+"""
+CLI пайплайна. Запуск из корня репозитория:
+
+    PYTHONPATH=src python -m btl status
+    PYTHONPATH=src python -m btl parse [--async] [источник ...]
+    PYTHONPATH=src python -m btl merge
+    PYTHONPATH=src python -m btl enrich
+    PYTHONPATH=src python -m btl all [--async]
+    PYTHONPATH=src python -m btl export [--formats csv,jsonl,xlsx] [--min-revenue 200]
+    PYTHONPATH=src python -m btl profile [--top N]
+    PYTHONPATH=src python -m btl loadtest [--companies N --workers W ...]
+
+--profile-startup (перед командой) печатает время импорта модулей,
+которые понадобились команде. --profile пишет время по сайтам
+(fetch/parse/regex/ner/save) в JSONL (--profile-path PATH, по умолчанию
+data/profile/spans.jsonl), --cprofile добавляет cProfile каждого сайта;
+`btl profile` показывает самые медленные сайты.
+"""
+import time
+
+T0 = time.perf_counter()
+
+import argparse
+import csv
+import importlib
+import os
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1]
+PARSERS = SRC / "parsers"
+for p in (str(SRC), str(PARSERS)):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+# Синхронные парсеры: имя источника (как в parsers/sources.py) -> скрипт
+SYNC_PARSERS = {
+    "alladvertising": "alladvertising_parsing.py",
+    "directline.pro": "directline_parsing.py",
+    "marketingtech": "marketing-tech_parsing.py",
+    "pavezlo.ru": "Povezlo_parsing.py",
+}
+RAW_DIR = Path("data/raw")
+MERGED_FILE = Path("data/interim/agencies_merged.csv")
+ENRICHED_FILE = Path("data/interim/agencies_merged_with_inn_ogrn.csv")
+DOMAIN_CACHE_FILE = Path("data/interim/domain_cache.json")
+PROFILE_FILE = Path("data/profile/spans.jsonl")
+
+STARTUP = []  # (что, секунды) для --profile-startup
+HEAVY_MODULES = ("pandas", "numpy", "bs4", "requests", "aiohttp", "transformers", "torch")
+
+
+def timed_import(name):
+    t = time.perf_counter()
+    module = importlib.import_module(name)
+    STARTUP.append((f"import {name}", time.perf_counter() - t))
+    return module
+
+
+def cmd_parse(args):
+    if args.use_async:
+        timed_import("run_async").main(args.sources)
+        return
+    import runpy
+
+    for name, script in SYNC_PARSERS.items():
+        if args.sources and name not in args.sources:
+            continue
+        print(f"[INFO] Запуск {script}...")
+        runpy.run_path(str(PARSERS / script), run_name="__main__")
+
+
+def cmd_merge(args):
+    timed_import("merge").main()
+
+
+def cmd_enrich(args):
+    timed_import("INN_OGRN_finding").main()
+
+
+def cmd_export(args):
+    export = timed_import("export")
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    columns = export.load_mapping(args.mapping) if args.mapping else export.EXPORT_COLUMNS
+    export.export(ENRICHED_FILE, export.OUT_DIR, formats, columns, args.min_revenue)
+
+
+def cmd_all(args):
+    cmd_parse(args)
+    cmd_merge(args)
+    cmd_enrich(args)
+    print(f"[INFO] Все шаги завершены. Результаты в {ENRICHED_FILE}")
+
+
+def cmd_profile(args):
+    profiling = timed_import("utils.profiling")
+    path = Path(args.path)
+    if not path.exists():
+        print(f"[ERROR] нет файла {path}: запустите команду с --profile")
+        return
+    print(profiling.format_report(profiling.load_report(path), args.top))
+
+
+def cmd_loadtest(args):
+    timed_import("loadtest").main(args.options)
+
+
+def count_rows(path, filled=()):
+    """(строк, {колонка: непустых}) без pandas — только модуль csv."""
+    if not path.exists():
+        return None, {}
+    # Файлы после ручной дообработки бывают в cp1251 и с ";" (как data/final)
+    from export import sniff_csv
+
+    encoding, delimiter = sniff_csv(path)
+
+    counts = dict.fromkeys(filled, 0)
+    n = 0
+    with open(path, encoding=encoding, errors="replace", newline="") as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            n += 1
+            for col in filled:
+                if (row.get(col) or "").strip():
+                    counts[col] += 1
+    return n, counts
+
+
+def cmd_status(args):
+    for path in sorted(RAW_DIR.glob("*.csv")):
+        n, _ = count_rows(path)
+        print(f"raw      {path.name:<40} {n} строк")
+    n, _ = count_rows(MERGED_FILE)
+    print(f"merged   {MERGED_FILE.name:<40} {n if n is not None else '—'} строк")
+    n, filled = count_rows(ENRICHED_FILE, ("inn", "ogrn", "contacts", "email"))
+    if n is None:
+        print(f"enriched {ENRICHED_FILE.name:<40} нет файла")
+    else:
+        details = ", ".join(f"{k}: {v}" for k, v in filled.items())
+        print(f"enriched {ENRICHED_FILE.name:<40} {n} строк ({details})")
+    if DOMAIN_CACHE_FILE.exists():
+        import json
+
+        cache = json.loads(DOMAIN_CACHE_FILE.read_text(encoding="utf-8"))
+        print(f"cache    {DOMAIN_CACHE_FILE.name:<40} {len(cache)} доменов")
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="btl", description="BTL companies pipeline")
+    ap.add_argument("--profile-startup", action="store_true",
+                    help="показать время импорта модулей")
+    ap.add_argument("--profile", action="store_true", help="время по сайтам в JSONL")
+    ap.add_argument("--profile-path", default=str(PROFILE_FILE), metavar="PATH",
+                    help=f"куда писать --profile (по умолчанию {PROFILE_FILE})")
+    ap.add_argument("--cprofile", action="store_true",
+                    help="вместе с --profile: cProfile каждого сайта (*.prof)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("parse", help="собрать рейтинги в data/raw")
+    p.add_argument("--async", dest="use_async", action="store_true",
+                   help="все источники в одном event loop")
+    p.add_argument("sources", nargs="*", help=f"источники: {', '.join(SYNC_PARSERS)}")
+    p.set_defaults(func=cmd_parse)
+
+    sub.add_parser("merge", help="объединить data/raw -> data/interim").set_defaults(func=cmd_merge)
+    sub.add_parser("enrich", help="ИНН/ОГРН и контакты с сайтов").set_defaults(func=cmd_enrich)
+    sub.add_parser("status", help="сводка по файлам пайплайна").set_defaults(func=cmd_status)
+
+    p = sub.add_parser("export", help="data/final/companies_export: CSV (cp1251, ;) + JSONL + XLSX")
+    p.add_argument("--formats", default="csv,jsonl,xlsx")
+    p.add_argument("--mapping", help="JSON с колонками выгрузки")
+    p.add_argument("--min-revenue", type=float, help="порог выручки, млн руб")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("profile", help="самые медленные сайты по данным --profile")
+    p.add_argument("path", nargs="?", default=str(PROFILE_FILE))
+    p.add_argument("--top", type=int, default=10)
+    p.set_defaults(func=cmd_profile)
+
+    # остальные аргументы передаются в src/loadtest.py как есть (см. main)
+    sub.add_parser("loadtest", help="прогон обогащения на локальном мок-вебе",
+                   add_help=False).set_defaults(func=cmd_loadtest, options=[])
+
+    p = sub.add_parser("all", help="parse + merge + enrich")
+    p.add_argument("--async", dest="use_async", action="store_true")
+    p.set_defaults(func=cmd_all, sources=[])
+    return ap
+
+
+def main(argv=None):
+    ap = build_parser()
+    args, extra = ap.parse_known_args(argv)
+    if extra:
+        if args.command != "loadtest":
+            ap.error(f"unrecognized arguments: {' '.join(extra)}")
+        args.options = extra
+    if args.profile:
+        # читается utils.profiling при импорте (и в дочерних скриптах main.py)
+        os.environ["BTL_PROFILE"] = args.profile_path
+        if args.cprofile:
+            os.environ["BTL_PROFILE_CPROFILE"] = "1"
+    ready = time.perf_counter() - T0
+    t = time.perf_counter()
+    try:
+        args.func(args)
+    finally:
+        if args.profile_startup:
+            print(f"[STARTUP] {'cli ready':<30} {ready:.3f} s")
+            for what, sec in STARTUP:
+                print(f"[STARTUP] {what:<30} {sec:.3f} s")
+            print(f"[STARTUP] {args.command + ' total':<30} {time.perf_counter() - t:.3f} s")
+            loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+            print(f"[STARTUP] heavy modules loaded: {', '.join(loaded) or 'none'}")
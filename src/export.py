@@ -0,0 +1,241 @@
+"""
+Выгрузка обогащённого датасета в финальные форматы за один проход.
+
+    python src/export.py                                  # CSV + JSONL + XLSX
+    python src/export.py --formats csv --min-revenue 200  # только CSV, выручка >= 200 млн
+    python src/export.py --mapping export_columns.json    # свой набор колонок
+
+Вход читается кусками по CHUNK_ROWS строк; каждый кусок сразу пишется во
+все выбранные форматы, поэтому в памяти нет ни всего файла, ни его копий.
+Файлы называются data/final/companies_export.*: ручной companies_final.csv
+(с ОКВЭД и карточками ФНС, которых во входе нет) выгрузка не трогает.
+CSV — в формате data/final (cp1251, ";", CRLF, выручка в млн с запятой).
+XLSX пишет openpyxl (есть в requirements.txt) в режиме write_only; без него
+формат пропускается с предупреждением.
+"""
+import argparse
+import codecs
+import json
+import os
+from pathlib import Path
+
+IN_FILE = Path("data/interim/agencies_merged_with_inn_ogrn.csv")
+OUT_DIR = Path("data/final")
+OUT_NAME = "companies_export"
+FORMATS = ("csv", "jsonl", "xlsx")
+CHUNK_ROWS = 5000
+
+# Диалект финального CSV (как у файла, который собирали вручную)
+CSV_ENCODING = "cp1251"
+CSV_SEP = ";"
+CSV_LINE_TERMINATOR = "\r\n"
+
+# Делители единиц для колонок-сумм (исходно выручка в рублях)
+UNITS = {"rub": 1, "thousand": 1_000, "mln": 1_000_000, "bn": 1_000_000_000}
+
+# (колонка в выгрузке, колонка во входном файле, единицы или None — текст как есть)
+EXPORT_COLUMNS = [
+    ("inn", "inn", None),
+    ("name", "name", None),
+    ("full_name", "full_name", None),
+    ("site", "site", None),
+    ("region", "region", None),
+    ("address", "address", None),
+    ("contacts", "contacts", None),
+    ("email", "email", None),
+    ("revenue_year", "revenue_year", None),
+    ("revenue,  млн.руб", "revenue", "mln"),
+    ("okved_main", "okved_main", None),
+    ("segment_tag", "segment_tag", None),
+    ("source", "source", None),
+    ("fns_card", "fns_card", None),
+]
+
+
+SNIFF_BYTES = 4096
+
+
+def sniff_csv(path, size=SNIFF_BYTES):
+    """(encoding, delimiter) по началу файла: utf-8/cp1251 и ","/";"."""
+    with open(path, "rb") as f:
+        head = f.read(size)
+    try:
+        # final=False: символ, разрезанный границей чтения, — не ошибка
+        codecs.getincrementaldecoder("utf-8")(errors="strict").decode(head, final=False)
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        encoding = "cp1251"
+    first_line = head.split(b"\n", 1)[0]
+    delimiter = ";" if first_line.count(b";") > first_line.count(b",") else ","
+    return encoding, delimiter
+
+
+def load_mapping(path):
+    """
+    JSON вида {"columns": [{"name": "...", "source": "...", "unit": "mln"}, ...]};
+    unit необязателен.
+    """
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    columns = [(c["name"], c.get("source", c["name"]), c.get("unit")) for c in spec["columns"]]
+    for name, _, unit in columns:
+        if unit is not None and unit not in UNITS:
+            raise ValueError(f"{name}: неизвестные единицы {unit!r}, есть {', '.join(UNITS)}")
+    return columns
+
+
+def map_chunk(chunk, columns):
+    """Кусок входа -> кусок выгрузки: переименование, пустые недостающие колонки, единицы."""
+    import pandas as pd
+    from utils.normalize import revenue_to_int
+
+    out = pd.DataFrame(index=chunk.index)
+    for name, source, unit in columns:
+        values = chunk[source] if source in chunk.columns else pd.Series("", index=chunk.index)
+        if unit is not None:
+            values = revenue_to_int(values).astype("Float64") / UNITS[unit]
+        out[name] = values
+    return out
+
+
+def format_amount(series):
+    """986.9 -> "986,9", 1100.0 -> "1100", <NA> -> "" (как в ручном CSV)."""
+    s = series.round(1).astype(str).str.replace(r"\.0$", "", regex=True)
+    return s.str.replace(".", ",", regex=False).where(series.notna(), "")
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "w", encoding=CSV_ENCODING, errors="replace", newline="")
+        self.header = True
+
+    def write(self, df, amount_cols):
+        df = df.copy()
+        for col in amount_cols:
+            df[col] = format_amount(df[col])
+        df.to_csv(self.f, sep=CSV_SEP, index=False, header=self.header,
+                  lineterminator=CSV_LINE_TERMINATOR)
+        self.header = False
+
+    def close(self):
+        self.f.close()
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write(self, df, amount_cols):
+        # суммы остаются числами, пустые -> null
+        df = df.astype(object).where(df.notna(), None)
+        for row in df.itertuples(index=False):
+            self.f.write(json.dumps(dict(zip(df.columns, row)), ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.f.close()
+
+
+class XlsxSink:
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet("companies")
+        self.header = True
+
+    def write(self, df, amount_cols):
+        if self.header:
+            self.ws.append(list(df.columns))
+            self.header = False
+        df = df.astype(object).where(df.notna(), None)
+        for row in df.itertuples(index=False):
+            self.ws.append(list(row))
+
+    def close(self):
+        self.wb.save(self.path)
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "xlsx": XlsxSink}
+
+
+def export(in_file=IN_FILE, out_dir=OUT_DIR, formats=FORMATS, columns=EXPORT_COLUMNS,
+           min_revenue=None, chunk_rows=CHUNK_ROWS):
+    """
+    Один проход по in_file. min_revenue (в единицах колонки выручки)
+    отбрасывает строки с известной выручкой ниже порога. Файлы пишутся во
+    временные *.tmp и заменяют старые только после успешного прохода.
+    Возвращает {формат: путь}.
+    """
+    import pandas as pd
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    amount_cols = [name for name, _, unit in columns if unit is not None]
+    revenue_col = next((name for name, source, unit in columns
+                        if unit is not None and source == "revenue"), None)
+    if min_revenue is not None and revenue_col is None:
+        raise ValueError("--min-revenue: в наборе колонок нет выручки с единицами")
+
+    sinks = {}
+    for fmt in formats:
+        final = out_dir / f"{OUT_NAME}.{fmt}"
+        tmp = final.with_suffix(final.suffix + ".tmp")
+        try:
+            sinks[fmt] = (SINKS[fmt](tmp), final)
+        except ImportError as e:
+            print(f"[WARN] {fmt} пропущен: {e}")
+
+    encoding, sep = sniff_csv(in_file)
+    n_in = n_out = 0
+    try:
+        for chunk in pd.read_csv(in_file, encoding=encoding, sep=sep, dtype=str,
+                                 keep_default_na=False, chunksize=chunk_rows):
+            n_in += len(chunk)
+            out = map_chunk(chunk, columns)
+            if min_revenue is not None:
+                rev = out[revenue_col]
+                out = out[rev.isna() | (rev >= min_revenue)]
+            n_out += len(out)
+            for sink, _ in sinks.values():
+                sink.write(out, amount_cols)
+    except BaseException:
+        # прежние выгрузки остаются нетронутыми
+        for sink, _ in sinks.values():
+            sink.close()
+            Path(sink.path).unlink(missing_ok=True)
+        raise
+    for sink, _ in sinks.values():
+        sink.close()
+
+    written = {}
+    for fmt, (sink, final) in sinks.items():
+        os.replace(sink.path, final)
+        written[fmt] = final
+    print(f"[INFO] Выгружено {n_out} из {n_in} строк: " + ", ".join(map(str, written.values())))
+    return written
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="export", description="финальные CSV/JSONL/XLSX")
+    ap.add_argument("--input", default=str(IN_FILE))
+    ap.add_argument("--out-dir", default=str(OUT_DIR))
+    ap.add_argument("--formats", default=",".join(FORMATS),
+                    help=f"через запятую: {', '.join(FORMATS)}")
+    ap.add_argument("--mapping", help="JSON с колонками выгрузки (см. load_mapping)")
+    ap.add_argument("--min-revenue", type=float,
+                    help="порог выручки в единицах колонки (для млн: 200)")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = ap.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        ap.error(f"неизвестные форматы: {', '.join(sorted(unknown))}")
+    columns = load_mapping(args.mapping) if args.mapping else EXPORT_COLUMNS
+    export(args.input, args.out_dir, formats, columns, args.min_revenue, args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Нагрузочный прогон обогащения на локальном мок-вебе (src/utils/mock_web.py).
+
+    python src/loadtest.py --companies 200 --workers 8
+    python src/loadtest.py --companies 200 --workers 16 --latency-ms 150 --error-rate 0.05 \\
+        --slowloris-rate 0.02 --timeout 5 --retries 1 --backoff 0.2 --ua-sleep 0
+
+Сервер запускается отдельным процессом (его CPU и память не попадают в
+замер). Для каждой компании — как в пайплайне: ссылка directline
+(recommend -> редиректы -> lander с rurl) разрешается в сайт, затем сайт
+обогащается enrich_record (главная, встроенные данные, обход, PDF).
+
+В отчёте: пропускная способность, p50/p90/p99 времени на компанию,
+доля найденных ИНН по профилям сайтов и пиковая память процесса.
+Настройки HTTP (--timeout/--retries/--backoff/--ua-sleep) подменяют
+константы INN_OGRN_finding и directline_parsing только на время прогона;
+--timeout задаёт все таймауты: страницы, PDF и Range, JSON-эндпоинты и
+ссылки directline.
+"""
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent
+for p in (str(SRC), str(SRC / "parsers")):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from utils import mock_web
+
+READY_TIMEOUT = 30
+
+
+def percentile(values, q):
+    """Ближайший ранг: q в [0, 100]."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[k]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux — КБ, macOS — байты
+    return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+@contextlib.contextmanager
+def mock_server(args):
+    cmd = [sys.executable, str(SRC / "utils" / "mock_web.py"), "serve", *mock_web.mock_argv(args)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    try:
+        deadline = time.monotonic() + READY_TIMEOUT
+        line = ""
+        while time.monotonic() < deadline and not line.startswith("READY"):
+            line = proc.stdout.readline()
+            if not line and proc.poll() is not None:
+                raise RuntimeError(f"мок-веб не запустился (код {proc.returncode})")
+        if not line.startswith("READY"):
+            raise RuntimeError("мок-веб не ответил READY")
+        print(f"[INFO] {line.strip()}")
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+@contextlib.contextmanager
+def http_settings(module, **overrides):
+    """Временно подменить константы модуля (None — оставить как есть)."""
+    saved = {k: getattr(module, k) for k in overrides}
+    for k, v in overrides.items():
+        if v is not None:
+            setattr(module, k, v)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(module, k, v)
+
+
+def run_company(c, port, enrich, directline, cache):
+    """(секунды, найденный ИНН или "", этап ошибки или "") для одной компании."""
+    from utils.company_record import CompanyRecord
+
+    t0 = time.perf_counter()
+    try:
+        html, final_url = directline.fetch_html(mock_web.recommend_url(c["index"], port))
+        site = directline.site_from_landing(html, final_url)
+    except Exception:
+        return time.perf_counter() - t0, "", "resolve"
+    if not site:
+        return time.perf_counter() - t0, "", "resolve"
+    record = CompanyRecord(name=c["name"], site=site)
+    try:
+        enrich.enrich_record(record, cache)
+    except Exception:
+        return time.perf_counter() - t0, "", "enrich"
+    return time.perf_counter() - t0, record.inn, ""
+
+
+def run(args):
+    import INN_OGRN_finding as enrich
+    import directline_parsing as directline
+    from utils.domain_cache import DomainCache
+
+    companies = [mock_web.company(i, args.seed) for i in range(args.companies)]
+    cache = DomainCache()  # только в памяти: каждый прогон с нуля
+    results = {}
+    log = sys.stdout if args.verbose else io.StringIO()
+
+    overrides = dict(HTTP_TIMEOUT=args.timeout, PDF_TIMEOUT=args.timeout,
+                     SMALL_FETCH_TIMEOUT=args.timeout, HTTP_RETRIES=args.retries,
+                     HTTP_BACKOFF=args.backoff, UA_RETRY_SLEEP=args.ua_sleep)
+    with mock_server(args), http_settings(enrich, **overrides), \
+            http_settings(directline, HTTP_TIMEOUT=args.timeout), contextlib.redirect_stdout(log):
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(run_company, c, args.port, enrich, directline, cache): c
+                       for c in companies}
+            for fut in as_completed(futures):
+                results[futures[fut]["index"]] = fut.result()
+        wall = time.perf_counter() - t0
+    report(args, companies, results, wall)
+
+
+def report(args, companies, results, wall):
+    latencies = [results[c["index"]][0] for c in companies]
+    print(f"\nкомпаний {len(companies)}, потоков {args.workers}, "
+          f"задержка {args.latency_ms:g} мс (sigma {args.latency_sigma:g}), "
+          f"503 {args.error_rate:.0%}, slow-loris {args.slowloris_rate:.0%}")
+    print(f"время        {wall:8.2f} s")
+    print(f"throughput   {len(companies) / wall:8.2f} компаний/s")
+    for q in (50, 90, 99):
+        print(f"p{q:<11} {percentile(latencies, q):8.2f} s")
+    print(f"max          {max(latencies):8.2f} s")
+    print(f"peak RSS     {peak_rss_mb():8.1f} MB")
+
+    errors = {}
+    print(f"\n{'профиль':<10} {'всего':>6} {'ИНН верно':>10} {'ошибка':>7}")
+    for profile in mock_web.PROFILE_WEIGHTS:
+        group = [c for c in companies if c["profile"] == profile]
+        if not group:
+            continue
+        ok = sum(results[c["index"]][1] == c["inn"] for c in group)
+        failed = sum(bool(results[c["index"]][2]) for c in group)
+        print(f"{profile:<10} {len(group):>6} {ok:>10} {failed:>7}")
+        for c in group:
+            stage = results[c["index"]][2]
+            if stage:
+                errors[stage] = errors.get(stage, 0) + 1
+    if errors:
+        print("ошибки по этапам: " + ", ".join(f"{k}: {v}" for k, v in errors.items()))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="loadtest", description="прогон обогащения на мок-вебе")
+    mock_web.add_mock_args(ap)
+    ap.add_argument("--workers", type=int, default=8, help="потоков обогащения")
+    ap.add_argument("--timeout", type=float, help="все HTTP-таймауты (HTTP_TIMEOUT, PDF_TIMEOUT, ...), с")
+    ap.add_argument("--retries", type=int, help="HTTP_RETRIES")
+    ap.add_argument("--backoff", type=float, help="HTTP_BACKOFF")
+    ap.add_argument("--ua-sleep", type=float, help="UA_RETRY_SLEEP, с")
+    ap.add_argument("--verbose", action="store_true", help="не скрывать лог обогащения")
+    run(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
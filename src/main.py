@@ -9,17 +9,20 @@ def run(script):
         sys.exit(1)
 
 def main():
-    # 1. Запуск всех парсеров
-    run("src\parsers\alladvertising_parsing.py")
-    run("src\parsers\directline_parsing.py")
-    run("src\parsers\marketing-tech_parsing.py")
-    run("src\parsers\Povezlo_parsing.py")
+    # 1. Запуск всех парсеров (--async: все источники в одном event loop)
+    if "--async" in sys.argv:
+        run("src/parsers/run_async.py")
+    else:
+        run("src/parsers/alladvertising_parsing.py")
+        run("src/parsers/directline_parsing.py")
+        run("src/parsers/marketing-tech_parsing.py")
+        run("src/parsers/Povezlo_parsing.py")
 
     # 2. Слияние результатов
-    run("src\merge.py")
+    run("src/merge.py")
 
     # 3. Автоматический парсинг ИНН/ОГРН
-    run("src\INN_OGRN_finding.py")
+    run("src/INN_OGRN_finding.py")
 
     print("[INFO] Все шаги завершены. Результаты в data/final/companies_final.csv")
 
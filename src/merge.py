@@ -1,17 +1,17 @@
-import pandas as pd
 from pathlib import Path
 
+from utils.company_record import frame_to_records, records_to_frame
+
 # Пути к исходным CSV
 files = {
-    "marketingtech": r"C:\Users\UZER\Documents\Ke\Тестовое на data analyst\src\data\marketingtech_top20.csv",
-    "alladvertising": r"C:\Users\UZER\Documents\Ke\Тестовое на data analyst\src\data\alladvertising_top20.csv",
-    "directline": r"C:\Users\UZER\Documents\Ke\Тестовое на data analyst\src\data\directline_pr_agencies.csv",
-    "pavezlo": r"C:\Users\UZER\Documents\Ke\Тестовое на data analyst\src\data\pavezlo_marketing_agencies.csv"
+    "marketingtech": Path("data/raw/marketingtech_top20.csv"),
+    "alladvertising": Path("data/raw/alladvertising_top20.csv"),
+    "directline": Path("data/raw/directline_pr_agencies.csv"),
+    "pavezlo": Path("data/raw/pavezlo_marketing_agencies.csv"),
 }
 
 # Итоговый файл
-OUT_FILE = Path("data/agencies_merged.csv")
-OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+OUT_FILE = Path("data/interim/agencies_merged.csv")
 
 # Универсальный набор колонок (объединение всех)
 columns = [
@@ -20,20 +20,37 @@ columns = [
     "address","founded","specializations","services","img_src","img_alt"
 ]
 
-dfs = []
-for src, path in files.items():
-    df = pd.read_csv(path, encoding="utf-8")
-    # добавляем недостающие колонки
-    for col in columns:
-        if col not in df.columns:
-            df[col] = ""
-    # приводим порядок колонок
-    df = df[columns]
-    dfs.append(df)
-
-# объединяем
-merged = pd.concat(dfs, ignore_index=True)
-
-# сохраняем
-merged.to_csv(OUT_FILE, index=False, encoding="utf-8")
-print("Saved", len(merged), "rows to", OUT_FILE)
+def normalize_frame(df):
+    """
+    Одна векторная нормализация по всему объединённому фрейму:
+    телефоны -> E.164, e-mail -> нижний регистр без дублей,
+    город -> субъект РФ, выручка -> целые рубли.
+    """
+    from utils.normalize import emails_clean, phones_e164, region_from_city, revenue_to_int
+
+    df = df.copy()
+    df["contacts"] = phones_e164(df["contacts"])
+    df["email"] = emails_clean(df["email"])
+    df["region"] = region_from_city(df["region"])
+    df["revenue"] = revenue_to_int(df["revenue"])
+    return df
+
+def main():
+    import pandas as pd
+
+    # CSV -> CompanyRecord: недостающие колонки становятся пустыми полями записи
+    records = []
+    for src, path in files.items():
+        df = pd.read_csv(path, encoding="utf-8", dtype=str, keep_default_na=False)
+        records.extend(frame_to_records(df, origin=src))
+
+    # объединяем, приводим порядок колонок и нормализуем значения
+    merged = normalize_frame(records_to_frame(records, columns))
+
+    # сохраняем
+    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    merged.to_csv(OUT_FILE, index=False, encoding="utf-8")
+    print("Saved", len(merged), "rows to", OUT_FILE)
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,35 @@
-import requests, certifi, urllib3, html as ihtml
+import requests, certifi, urllib3, sys, html as ihtml
 from bs4 import BeautifulSoup
-import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.company_record import CompanyRecord, records_to_frame
+from utils.decoding import response_text
+
 URL = "https://pavezlo.ru/rejtingi/rejting-marketingovyh-agentstv-2025-70-luchshih-agentstv-marketinga/"
-OUT_FILE = Path("data/pavezlo_marketing_agencies.csv")
+OUT_FILE = Path("data/raw/pavezlo_marketing_agencies.csv")
 OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+OUT_COLUMNS = ["name","region","site","contacts","email","address","founded",
+               "segment_tag","description","rating_ref","source","img_src","img_alt"]
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 def fetch_html(url):
     r = requests.get(url, timeout=20, verify=certifi.where())
     r.raise_for_status()
-    return r.text
+    return response_text(r)
 
 def clean(s): return ihtml.unescape(s).strip()
 
 def parse():
     html = fetch_html(URL)
+    records = parse_list_html(html)
+
+    df = records_to_frame(records, OUT_COLUMNS).drop_duplicates(subset=["name","site"])
+    df.to_csv(OUT_FILE, index=False, encoding="utf-8")
+    print("Saved", len(df), "rows to", OUT_FILE)
+
+def parse_list_html(html):
     soup = BeautifulSoup(html, "html.parser")
     records = []
 
@@ -38,7 +50,7 @@ def parse():
         for li in ol.select("li a[href]"):
             name = clean(li.get_text())
             site = li["href"].strip()
-            records.append({
+            records.append(CompanyRecord.from_mapping({
                 "name": name,
                 "region": region,
                 "site": site,
@@ -52,11 +64,8 @@ def parse():
                 "source": "pavezlo.ru",
                 "img_src": "",
                 "img_alt": ""
-            })
-
-    df = pd.DataFrame(records).drop_duplicates(subset=["name","site"])
-    df.to_csv(OUT_FILE, index=False, encoding="utf-8")
-    print("Saved", len(df), "rows to", OUT_FILE)
+            }, origin="pavezlo.ru"))
+    return records
 
 if __name__ == "__main__":
     parse()
@@ -2,15 +2,21 @@ import requests, certifi, urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import re, time
+import re, sys, time
 from urllib.parse import urljoin
-import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.company_record import CompanyRecord, records_to_frame
+from utils.decoding import response_text
+from utils.profiling import PROFILER
+
 LIST_URL = "https://www.alladvertising.ru/top/btl/"
 BASE_ORIGIN = "https://www.alladvertising.ru"
-OUT_FILE = Path("data\raw\alladvertising_top20.csv")
+OUT_FILE = Path("data/raw/alladvertising_top20.csv")
 OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+OUT_COLUMNS = ["name","region","site","contacts","email","address","founded",
+               "segment_tag","description","rating_ref","source","img_src","img_alt"]
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -32,14 +38,14 @@ def text(el): return el.get_text(strip=True) if el else ""
 def fetch_html(url):
     try:
         r = SESSION.get(url, timeout=20, verify=certifi.where())
-        r.raise_for_status(); return r.text
+        r.raise_for_status(); return response_text(r)
     except requests.exceptions.SSLError:
         try:
             r = SESSION.get(url.replace("https://","http://"), timeout=20)
-            r.raise_for_status(); return r.text
+            r.raise_for_status(); return response_text(r)
         except:
             r = SESSION.get(url, timeout=20, verify=False)
-            r.raise_for_status(); return r.text
+            r.raise_for_status(); return response_text(r)
     except: return ""
 
 # --- список ТОП-20 ---
@@ -73,8 +79,14 @@ def extract_top20_links(html):
 
 # --- карточка ---
 def parse_card(url, preview):
-    html = fetch_html(url)
-    if not html: return {}
+    with PROFILER.site(url):
+        with PROFILER.span("fetch"):
+            html = fetch_html(url)
+        if not html: return None
+        with PROFILER.span("parse"):
+            return parse_card_html(html, url, preview)
+
+def parse_card_html(html, url, preview):
     soup = BeautifulSoup(html,"html.parser")
     name = text(soup.select_one("span.h1_700b")) or text(soup.select_one("h1"))
     city = text(soup.select_one("span.h1_300")).lstrip(", ") if soup.select_one("span.h1_300") else ""
@@ -106,7 +118,7 @@ def parse_card(url, preview):
     founded = ""
     m = re.search(r"основан[оая]?.{0,20}?(\d{4})", soup.get_text(" ",strip=True), re.I)
     if m: founded = m.group(1)
-    return {
+    return CompanyRecord.from_mapping({
         "name": name or preview.get("name",""),
         "region": city or preview.get("region",""),
         "site": site,
@@ -120,7 +132,7 @@ def parse_card(url, preview):
         "source": "alladvertising",
         "img_src": preview.get("img_src",""),
         "img_alt": preview.get("img_alt","")
-    }
+    }, origin="alladvertising")
 
 def main():
     html = fetch_html(LIST_URL)
@@ -131,7 +143,7 @@ def main():
         data = parse_card(link, prev)
         if data: records.append(data)
         time.sleep(0.5)
-    df = pd.DataFrame(records).drop_duplicates(subset=["name","site"])
+    df = records_to_frame(records, OUT_COLUMNS).drop_duplicates(subset=["name","site"])
     df.to_csv(OUT_FILE,index=False,encoding="utf-8")
     print("Saved",len(df),"rows to",OUT_FILE)
 
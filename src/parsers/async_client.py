@@ -0,0 +1,95 @@
+"""
+Общий асинхронный HTTP-клиент для парсеров рейтингов.
+
+Один aiohttp.ClientSession на все источники: глобальный лимит соединений,
+лимит на хост, ретраи на 429/5xx и та же лестница фолбэков, что была
+в alladvertising_parsing.fetch_html: https -> http -> verify=False.
+"""
+import asyncio
+import ssl
+from urllib.parse import urlparse
+
+import aiohttp
+import certifi
+
+from utils.decoding import decode_bytes
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+class AsyncFetchClient:
+    def __init__(self, concurrency=16, per_host=4, timeout=25, retries=3, backoff=1.2):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+        self.session = None
+        self._host_locks = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout, headers=HEADERS
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _get(self, url, ssl_opt, allow_redirects):
+        last_exc = None
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.session.get(url, ssl=ssl_opt, allow_redirects=allow_redirects) as r:
+                    if r.status in RETRY_STATUS and attempt < self.retries:
+                        await asyncio.sleep(self.backoff * (2 ** attempt))
+                        continue
+                    r.raise_for_status()
+                    # r.text() без charset гоняет детектор по всему телу
+                    body = await r.read()
+                    text, _ = decode_bytes(body, r.headers.get("Content-Type", ""), r.url.host or "")
+                    return text, str(r.url)
+            except aiohttp.ClientSSLError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_exc = e
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUS:
+                    break
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * (2 ** attempt))
+        raise last_exc
+
+    async def fetch(self, url, allow_redirects=True):
+        """(html, final_url); при любой неудаче — ("", url) и сообщение в лог."""
+        try:
+            try:
+                return await self._get(url, self.ssl_ctx, allow_redirects)
+            except aiohttp.ClientSSLError:
+                try:
+                    return await self._get(url.replace("https://", "http://", 1), None, allow_redirects)
+                except Exception:
+                    return await self._get(url, False, allow_redirects)
+        except Exception as e:
+            print(f"[HTTP] {url} -> {e!r}")
+            return "", url
+
+    async def fetch_text(self, url):
+        html, _ = await self.fetch(url)
+        return html
+
+    def host_delay(self, url, seconds):
+        """
+        Вежливая пауза между запросами к одному хосту (аналог time.sleep
+        в синхронных парсерах), не блокирующая остальные источники.
+        """
+        host = urlparse(url).netloc
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+
+        async def _pause():
+            async with lock:
+                await asyncio.sleep(seconds)
+
+        return _pause()
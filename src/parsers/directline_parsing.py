@@ -1,20 +1,27 @@
-import requests, certifi, urllib3, re, time, html as ihtml
+import requests, certifi, urllib3, re, sys, time, html as ihtml
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse, parse_qs
-import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.company_record import CompanyRecord, records_to_frame
+from utils.decoding import response_text
+
 URL = "https://www.directline.pro/blog/pr-agentstva/"
 BASE = "https://www.directline.pro"
-OUT_FILE = Path("data\raw\directline_pr_agencies.csv")
+OUT_FILE = Path("data/raw/directline_pr_agencies.csv")
 OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+OUT_COLUMNS = ["name","region","site","contacts","email","address","founded",
+               "segment_tag","description","rating_ref","source","img_src","img_alt"]
+
+HTTP_TIMEOUT = 20  # module-level so src/loadtest.py can tune it against the mock web
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 def fetch_html(url, allow_redirects=True):
-    r = requests.get(url, timeout=20, verify=certifi.where(), allow_redirects=allow_redirects)
+    r = requests.get(url, timeout=HTTP_TIMEOUT, verify=certifi.where(), allow_redirects=allow_redirects)
     r.raise_for_status()
-    return r.text, r.url
+    return response_text(r), r.url
 
 def text(el): return el.get_text(" ", strip=True) if el else ""
 def clean(s): return ihtml.unescape(s).strip()
@@ -50,6 +57,19 @@ def resolve_site(href):
     - Если попали на /lander/... с rurl — берём rurl, нормализуем.
     - Иначе пытаемся найти внешние ссылки внутри HTML.
     """
+    href, site = direct_site(href)
+    if site:
+        return site
+
+    # Переход по recommend/lander
+    html, final_url = fetch_html(href, allow_redirects=True)
+    return site_from_landing(html, final_url)
+
+def direct_site(href):
+    """
+    (абсолютный href, сайт) — сайт непуст, если ссылка сразу внешняя
+    и переходить по recommend/lander не нужно.
+    """
     # Абсолютный href
     if href.startswith("/"):
         href = urljoin(BASE, href)
@@ -58,10 +78,11 @@ def resolve_site(href):
     parsed = urlparse(href)
     host = parsed.netloc.lower()
     if host and ("directline.pro" not in host) and ("dlrecommend.ru" not in host):
-        return normalize_site(href)
+        return href, normalize_site(href)
+    return href, ""
 
-    # Переход по recommend/lander
-    html, final_url = fetch_html(href, allow_redirects=True)
+def site_from_landing(html, final_url):
+    """Сайт по странице, на которую привели редиректы recommend/lander."""
     pf = urlparse(final_url)
     host_f = pf.netloc.lower()
 
@@ -103,6 +124,18 @@ def resolve_site(href):
 
 def parse():
     html, _ = fetch_html(URL)
+    records = parse_list_html(html, resolve=resolve_site)
+
+    df = records_to_frame(records, OUT_COLUMNS).drop_duplicates(subset=["name","site"])
+    df.to_csv(OUT_FILE, index=False, encoding="utf-8")
+    print("Saved", len(df), "rows to", OUT_FILE)
+
+def parse_list_html(html, resolve=None):
+    """
+    Записи из таблицы агентств. resolve(href) -> сайт вызывается по ходу;
+    без resolve сайт остаётся пустым, а ссылка кнопки — в rating_ref
+    (асинхронный путь разрешает их пачкой).
+    """
     soup = BeautifulSoup(html, "html.parser")
     records = []
 
@@ -120,8 +153,8 @@ def parse():
         # Сайт
         site = ""
         btn = item.select_one("a.blog-table-item__button[href]")
-        if btn:
-            site = resolve_site(btn["href"].strip())
+        if btn and resolve:
+            site = resolve(btn["href"].strip())
 
         # Описание / теги
         lis = item.select("div.blog-table-item__list li")
@@ -139,7 +172,7 @@ def parse():
             href = btn["href"].strip()
             rating_ref = urljoin(BASE, href) if href.startswith("/") else href
 
-        records.append({
+        records.append(CompanyRecord.from_mapping({
             "name": name,
             "region": region,
             "site": site,
@@ -153,12 +186,10 @@ def parse():
             "source": "directline.pro",
             "img_src": img_src,
             "img_alt": img_alt
-        })
-        time.sleep(0.2)
-
-    df = pd.DataFrame(records).drop_duplicates(subset=["name","site"])
-    df.to_csv(OUT_FILE, index=False, encoding="utf-8")
-    print("Saved", len(df), "rows to", OUT_FILE)
+        }, origin="directline.pro"))
+        if resolve:
+            time.sleep(0.2)
+    return records
 
 if __name__ == "__main__":
     parse()
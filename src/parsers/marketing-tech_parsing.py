@@ -2,14 +2,43 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import re, time
+import sys, time
 from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl
-import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.card_spec import CardSpec
+from utils.company_record import CompanyRecord, records_to_frame
+from utils.decoding import response_text
+from utils.normalize import first_int, revenue_to_int, year
+from utils.profiling import PROFILER
+
 LIST_URL = "https://marketing-tech.ru/company_tags/btl/"
-OUT_FILE = Path("data\raw\marketingtech_top20.csv")
+OUT_FILE = Path("data/raw/marketingtech_top20.csv")
 OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+OUT_COLUMNS = ["inn","name","revenue_year","revenue","segment_tag","source","rating_ref",
+               "okved_main","employees","site","description","region","contacts",
+               "founded","specializations","services","address"]
+
+# Где лежат поля карточки: описывается один раз, таблицы проходятся за один проход
+CARD_SPEC = CardSpec(
+    text={
+        "revenue": ".company-flow div",
+        "contacts": ".company-basics__table a.full",
+        "description": ".about-company p",
+    },
+    attrs={"site": (".company-basics__table a.company-website-button", "href")},
+    lists={
+        "specializations": ".basic-information-table__column_specials a",
+        "services": ".basic-information-table__column_services a",
+        "segment_tag": "figure.company-tags a.btn",
+    },
+    tables=[
+        (".basic-information-table__column_about .table-row", ".table-row__col_1", ".table-row__col_2",
+         {"Город": "region", "Основана": "founded", "Штат": "employees"}),
+        (".company-basics__table .table-row", ".th", ".td", {"Адрес": "address"}),
+    ],
+)
 
 # ---- session with retries
 def make_session():
@@ -29,7 +58,7 @@ def fetch_html(url, timeout=25):
     try:
         resp = SESSION.get(url, timeout=timeout)
         resp.raise_for_status()
-        return resp.text
+        return response_text(resp)
     except Exception as e:
         print(f"[HTTP] {url} -> {e}")
         return ""
@@ -37,17 +66,6 @@ def fetch_html(url, timeout=25):
 def text_or_none(el):
     return el.get_text(strip=True) if el else ""
 
-def normalize_revenue(text):
-    if not text: return ""
-    s = text.lower().replace(" ", "")
-    nums = re.findall(r"[\d.,]+", s)
-    if "млрд" in s and nums:
-        return int(float(nums[0].replace(",", ".")) * 1_000_000_000)
-    if "млн" in s and nums:
-        return int(float(nums[0].replace(",", ".")) * 1_000_000)
-    digits = re.sub(r"[^\d]", "", text)
-    return int(digits) if digits else ""
-
 def clean_site_url(url: str) -> str:
     if not url:
         return ""
@@ -61,15 +79,18 @@ def clean_site_url(url: str) -> str:
     cleaned = parsed._replace(query=query, fragment="")
     return urlunparse(cleaned)
 
-def parse_int_value(text: str):
-    if not text: return ""
-    m = re.search(r"\d+", text.replace(" ", ""))
-    return int(m.group(0)) if m else ""
-
 def parse_company_card(card_url, throttle_sec=0.8):
-    html = fetch_html(card_url)
-    if not html:
-        return {}
+    with PROFILER.site(card_url):
+        with PROFILER.span("fetch"):
+            html = fetch_html(card_url)
+        if not html:
+            return None
+        with PROFILER.span("parse"):
+            record = parse_card_html(html, card_url)
+    time.sleep(throttle_sec)
+    return record
+
+def parse_card_html(html, card_url):
     soup = BeautifulSoup(html, "html.parser")
 
     # --- Name: prefer h1 a, else strip star/age medal from h1 ---
@@ -84,60 +105,24 @@ def parse_company_card(card_url, throttle_sec=0.8):
                 bad.decompose()
             name = text_or_none(h1)
 
-    # Сайт
-    site_el = soup.select_one(".company-basics__table a.company-website-button")
-    raw_site = site_el.get("href") if site_el else ""
-    site = clean_site_url(raw_site)
-
-    # Выручка
-    revenue_text = text_or_none(soup.select_one(".company-flow div"))
-    revenue = normalize_revenue(revenue_text)
-
-    # Город, основана, штат
-    city, founded, staff = "", "", ""
-    for row in soup.select(".basic-information-table__column_about .table-row"):
-        left = text_or_none(row.select_one(".table-row__col_1"))
-        right = text_or_none(row.select_one(".table-row__col_2"))
-        if "Город" in left: city = right
-        elif "Основана" in left: founded = right
-        elif "Штат" in left: staff = parse_int_value(right)
-
-    specials = [text_or_none(a) for a in soup.select(".basic-information-table__column_specials a")]
-    services = [text_or_none(a) for a in soup.select(".basic-information-table__column_services a")]
-    tags = [text_or_none(a) for a in soup.select("figure.company-tags a.btn")]
-
-    phone_el = soup.select_one(".company-basics__table a.full")
-    phone = text_or_none(phone_el)
-
-    address = ""
-    for row in soup.select(".company-basics__table .table-row"):
-        th = text_or_none(row.select_one(".th"))
-        td = text_or_none(row.select_one(".td"))
-        if "Адрес" in th:
-            address = td
-
-    description = text_or_none(soup.select_one(".about-company p"))
-
-    time.sleep(throttle_sec)
-    return {
-        "inn": "",
-        "name": name,
-        "revenue_year": "",
-        "revenue": revenue,
-        "segment_tag": ";".join(tags) if tags else "BTL",
-        "source": "marketingtech",
-        "rating_ref": card_url,
-        "okved_main": "",
-        "employees": staff,
-        "site": site,
-        "description": description,
-        "region": city,
-        "contacts": phone,
-        "founded": founded,
-        "specializations": ";".join(specials),
-        "services": ";".join(services),
-        "address": address
-    }
+    # Сайт, выручка, город/основана/штат, адрес, телефон, теги — по CARD_SPEC;
+    # числа остаются строками до пакетной нормализации в finalize_frame
+    fields = CARD_SPEC.extract(soup)
+    fields["site"] = clean_site_url(fields["site"])
+    fields["segment_tag"] = fields["segment_tag"] or "BTL"
+
+    return CompanyRecord.from_mapping(
+        dict(fields, name=name, source="marketingtech", rating_ref=card_url),
+        origin="marketingtech",
+    )
+
+def finalize_frame(df, min_revenue=200_000_000):
+    """Нормализация чисел сразу по всей пачке карточек + фильтр по выручке ≥ 200 млн ₽."""
+    df = df.copy()
+    df["revenue"] = revenue_to_int(df["revenue"])
+    df["employees"] = first_int(df["employees"])
+    df["founded"] = year(df["founded"])
+    return df[df["revenue"].fillna(0) >= min_revenue].reset_index(drop=True)
 
 def extract_top20_links(list_html):
     soup = BeautifulSoup(list_html, "html.parser")
@@ -168,13 +153,10 @@ def main():
     for i, link in enumerate(top20_links, 1):
         print(f"[CARD {i}/{len(top20_links)}] {link}")
         data = parse_company_card(link)
-        if data.get("name"):
+        if data and data.filled("name"):
             records.append(data)
 
-    # Фильтр по выручке ≥ 200 млн ₽
-    filtered = [r for r in records if isinstance(r["revenue"], int) and r["revenue"] >= 200_000_000]
-
-    df = pd.DataFrame(filtered)
+    df = finalize_frame(records_to_frame(records, OUT_COLUMNS))
     df.to_csv(OUT_FILE, index=False, encoding="utf-8")
     print(f"Saved {len(df)} rows to {OUT_FILE}")
 
@@ -0,0 +1,78 @@
+"""
+Асинхронный запуск всех парсеров рейтингов в одном event loop.
+
+    python src/parsers/run_async.py                  # все источники
+    python src/parsers/run_async.py marketingtech    # выборочно
+
+Результат — те же CSV в data/raw, что и у синхронных скриптов.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from async_client import AsyncFetchClient
+from sources import SOURCES
+from utils.company_record import records_to_frame
+from utils.profiling import PROFILER
+
+
+async def crawl_source(plugin, client):
+    print(f"[INFO] {plugin.name}: {plugin.list_url}")
+    list_html = await client.fetch_text(plugin.list_url)
+    if not list_html:
+        print(f"[ERROR] {plugin.name}: пустой список")
+        return plugin, []
+
+    records = plugin.parse_list(list_html)
+
+    async def card(url, preview):
+        if plugin.card_delay:
+            await client.host_delay(url, plugin.card_delay)
+        # gather() runs each card in its own task/context: spans do not mix
+        with PROFILER.site(url):
+            with PROFILER.span("fetch"):
+                html = await client.fetch_text(url)
+            if not html:
+                return None
+            with PROFILER.span("parse"):
+                return plugin.parse_card(html, url, preview)
+
+    links = plugin.extract_links(list_html)
+    if links:
+        print(f"[INFO] {plugin.name}: карточек {len(links)}")
+        cards = await asyncio.gather(*(card(u, p) for u, p in links))
+        records.extend(r for r in cards if r)
+
+    records = await plugin.postprocess(records, client)
+    return plugin, records
+
+
+def save(plugin, records):
+    df = plugin.finalize_frame(records_to_frame(records, plugin.out_columns))
+    if {"name", "site"} <= set(df.columns):
+        df = df.drop_duplicates(subset=["name", "site"])
+    df.to_csv(plugin.out_file, index=False, encoding="utf-8")
+    print(f"Saved {len(df)} rows to {plugin.out_file}")
+
+
+async def run(plugins):
+    async with AsyncFetchClient() as client:
+        results = await asyncio.gather(
+            *(crawl_source(p, client) for p in plugins), return_exceptions=True
+        )
+    for plugin, res in zip(plugins, results):
+        if isinstance(res, Exception):
+            print(f"[ERROR] {plugin.name}: {res!r}")
+            continue
+        save(*res)
+
+
+def main(names=None):
+    plugins = [p for p in SOURCES if not names or p.name in names]
+    asyncio.run(run(plugins))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,119 @@
+"""
+Источники-рейтинги как плагины для асинхронного раннера (run_async.py).
+
+Плагин описывает только то, что специфично для сайта: URL списка,
+извлечение ссылок на карточки и разбор карточки. Разбор переиспользует
+функции синхронных парсеров, поэтому оба пути дают одинаковые CSV.
+Новый рейтинг = новый подкласс SourcePlugin + строка в SOURCES.
+"""
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+alladvertising = importlib.import_module("alladvertising_parsing")
+directline = importlib.import_module("directline_parsing")
+marketingtech = importlib.import_module("marketing-tech_parsing")
+pavezlo = importlib.import_module("Povezlo_parsing")
+
+
+class SourcePlugin:
+    name = ""
+    list_url = ""
+    out_file = None
+    out_columns = []
+    card_delay = 0.0  # пауза между карточками одного хоста, сек
+
+    def extract_links(self, html):
+        """[(card_url, preview_dict)] — карточки для скачивания."""
+        return []
+
+    def parse_card(self, html, url, preview):
+        """CompanyRecord | None по HTML карточки."""
+        return None
+
+    def parse_list(self, html):
+        """Записи, которые берутся прямо со страницы списка (без карточек)."""
+        return []
+
+    async def postprocess(self, records, client):
+        return records
+
+    def finalize_frame(self, df):
+        """Пакетная нормализация/фильтрация уже собранного DataFrame."""
+        return df
+
+
+class AlladvertisingSource(SourcePlugin):
+    name = "alladvertising"
+    list_url = alladvertising.LIST_URL
+    out_file = alladvertising.OUT_FILE
+    out_columns = alladvertising.OUT_COLUMNS
+    card_delay = 0.5
+
+    def extract_links(self, html):
+        links, previews = alladvertising.extract_top20_links(html)
+        return list(zip(links, previews))
+
+    def parse_card(self, html, url, preview):
+        return alladvertising.parse_card_html(html, url, preview)
+
+
+class MarketingTechSource(SourcePlugin):
+    name = "marketingtech"
+    list_url = marketingtech.LIST_URL
+    out_file = marketingtech.OUT_FILE
+    out_columns = marketingtech.OUT_COLUMNS
+    card_delay = 0.8
+
+    def extract_links(self, html):
+        return [(link, {}) for link in marketingtech.extract_top20_links(html)]
+
+    def parse_card(self, html, url, preview):
+        record = marketingtech.parse_card_html(html, url)
+        return record if record.filled("name") else None
+
+    def finalize_frame(self, df):
+        return marketingtech.finalize_frame(df)
+
+
+class DirectlineSource(SourcePlugin):
+    name = "directline.pro"
+    list_url = directline.URL
+    out_file = directline.OUT_FILE
+    out_columns = directline.OUT_COLUMNS
+
+    def parse_list(self, html):
+        return directline.parse_list_html(html)
+
+    async def postprocess(self, records, client):
+        # recommend/lander-редиректы разрешаем параллельно, а не по одному
+        async def resolve(record):
+            href, site = directline.direct_site(record.rating_ref)
+            if not site and href:
+                html, final_url = await client.fetch(href)
+                site = directline.site_from_landing(html, final_url) if html else ""
+            record.site = site
+
+        await asyncio.gather(*(resolve(r) for r in records if r.filled("rating_ref")))
+        return records
+
+
+class PavezloSource(SourcePlugin):
+    name = "pavezlo.ru"
+    list_url = pavezlo.URL
+    out_file = pavezlo.OUT_FILE
+    out_columns = pavezlo.OUT_COLUMNS
+
+    def parse_list(self, html):
+        return pavezlo.parse_list_html(html)
+
+
+SOURCES = [
+    AlladvertisingSource(),
+    DirectlineSource(),
+    MarketingTechSource(),
+    PavezloSource(),
+]
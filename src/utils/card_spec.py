@@ -0,0 +1,61 @@
+"""
+Декларативный разбор карточек компаний.
+
+Источник один раз описывает, где лежат поля (CardSpec): простые селекторы
+текста/атрибутов/списков и «таблицы» вида метка -> значение. Таблица
+проходится за один проход: метка каждой строки сопоставляется заранее
+скомпилированному регулярному выражению из всех меток спецификации.
+
+На выходе — сырые строки; числа (выручка, штат, год) приводятся потом
+пачкой по всему DataFrame в utils/normalize.py.
+"""
+import re
+
+
+class LabelTable:
+    def __init__(self, rows, label, value, mapping):
+        self.rows = rows
+        self.label = label
+        self.value = value
+        self.fields = list(mapping.values())
+        # Одна регулярка на все метки: номер сработавшей группы -> поле
+        self.pattern = re.compile(
+            "|".join(f"({re.escape(k)})" for k in mapping), re.I
+        )
+
+    def scan(self, soup, out):
+        for row in soup.select(self.rows):
+            label_el = row.select_one(self.label)
+            if not label_el:
+                continue
+            m = self.pattern.search(label_el.get_text(strip=True))
+            if not m:
+                continue
+            value_el = row.select_one(self.value)
+            # как и раньше: при повторе метки побеждает последняя строка
+            out[self.fields[m.lastindex - 1]] = value_el.get_text(strip=True) if value_el else ""
+
+
+class CardSpec:
+    def __init__(self, text=None, attrs=None, lists=None, tables=(), list_sep=";"):
+        self.text = text or {}
+        self.attrs = attrs or {}
+        self.lists = lists or {}
+        self.tables = [LabelTable(*t) for t in tables]
+        self.list_sep = list_sep
+
+    def extract(self, soup):
+        out = {}
+        for field, sel in self.text.items():
+            el = soup.select_one(sel)
+            out[field] = el.get_text(strip=True) if el else ""
+        for field, (sel, attr) in self.attrs.items():
+            el = soup.select_one(sel)
+            out[field] = (el.get(attr) or "") if el else ""
+        for field, sel in self.lists.items():
+            out[field] = self.list_sep.join(a.get_text(strip=True) for a in soup.select(sel))
+        for table in self.tables:
+            for field in table.fields:
+                out.setdefault(field, "")
+            table.scan(soup, out)
+        return out
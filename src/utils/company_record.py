@@ -0,0 +1,118 @@
+"""
+Единая запись о компании для парсеров, слияния и обогащения.
+
+Внутри пайплайна строки живут как CompanyRecord (dataclass со __slots__),
+в DataFrame они превращаются только на границах ввода/вывода
+(records_to_frame / frame_to_records). Правила слияния заданы на уровне
+полей, а provenance запоминает, откуда пришло каждое значение.
+"""
+from dataclasses import dataclass, field, fields
+
+# Правила слияния:
+#   FILL — значение берётся, только если поле ещё пустое (по умолчанию);
+#   KEEP — метаданные источника, обогащение их не трогает.
+FILL = "fill"
+KEEP = "keep"
+MERGE_RULES = {
+    "name": KEEP,
+    "site": KEEP,
+    "segment_tag": KEEP,
+    "source": KEEP,
+    "rating_ref": KEEP,
+}
+
+
+def is_empty(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:  # NaN из pandas
+        return True
+    return str(value).strip() in ("", "nan", "None")
+
+
+@dataclass(slots=True)
+class CompanyRecord:
+    inn: str = ""
+    ogrn: str = ""
+    name: str = ""
+    full_name: str = ""
+    site: str = ""
+    region: str = ""
+    address: str = ""
+    contacts: str = ""
+    email: str = ""
+    revenue_year: str = ""
+    revenue: "str | int" = ""
+    segment_tag: str = ""
+    source: str = ""
+    rating_ref: str = ""
+    okved_main: str = ""
+    employees: "str | int" = ""
+    description: str = ""
+    founded: str = ""
+    specializations: str = ""
+    services: str = ""
+    img_src: str = ""
+    img_alt: str = ""
+    doc_url: str = ""
+    doc_type: str = ""
+    provenance: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_mapping(cls, values, origin="", strict=True):
+        """
+        Запись из dict / pandas-строки. strict=False молча пропускает чужие
+        ключи (колонки CSV), strict=True — ошибка на опечатку в парсере.
+        """
+        rec = cls()
+        for k, v in values.items():
+            if k not in FIELD_NAMES:
+                if strict:
+                    raise KeyError(f"unknown CompanyRecord field: {k}")
+                continue
+            if is_empty(v):
+                continue
+            setattr(rec, k, v.strip() if isinstance(v, str) else v)
+            if origin:
+                rec.provenance[k] = origin
+        return rec
+
+    def filled(self, name):
+        return not is_empty(getattr(self, name))
+
+    def merge(self, values, origin="", overwrite=()):
+        """
+        Влить найденные значения по правилам полей. Поля из overwrite
+        заменяются безусловно (например doc_url/doc_type, когда документ
+        действительно дал реквизиты). Возвращает self.
+        """
+        for k, v in values.items():
+            if k not in FIELD_NAMES or is_empty(v):
+                continue
+            if k not in overwrite and (MERGE_RULES.get(k, FILL) == KEEP or self.filled(k)):
+                continue
+            setattr(self, k, v)
+            if origin:
+                self.provenance[k] = origin
+        return self
+
+    def to_dict(self, columns=None):
+        cols = columns or FIELD_NAMES
+        return {c: getattr(self, c, "") for c in cols}
+
+
+FIELD_NAMES = tuple(f.name for f in fields(CompanyRecord) if f.name != "provenance")
+
+
+def records_to_frame(records, columns=None):
+    import pandas as pd
+
+    cols = list(columns or FIELD_NAMES)
+    return pd.DataFrame([r.to_dict(cols) for r in records], columns=cols)
+
+
+def frame_to_records(df, origin=""):
+    return [
+        CompanyRecord.from_mapping(row, origin=origin, strict=False)
+        for row in df.to_dict("records")
+    ]
@@ -0,0 +1,115 @@
+"""
+Декодирование HTTP-ответов и PDF в текст без угадывания по всему телу.
+
+requests.Response.text без charset в заголовке запускает детектор по всему
+ответу (медленно на больших страницах) и часто ошибается на cp1251,
+после чего кириллица ломает RE_COMPANY / RE_REGION. Здесь порядок такой:
+
+    BOM -> charset из Content-Type -> <meta charset> в первых 4 КБ
+        -> (JSON без charset — utf-8) -> строгий utf-8
+        -> кодировка, уже найденная для этого хоста
+        -> детектор по небольшому фрагменту -> cp1251
+
+Найденная однобайтовая кодировка запоминается по хосту, но только как
+запасная: страница без объявленной кодировки сначала проверяется как
+utf-8 (JSON-эндпоинты и новые разделы сайта на cp1251 обычно в utf-8).
+"""
+import codecs
+import re
+import threading
+from urllib.parse import urlparse
+
+try:
+    from charset_normalizer import from_bytes as _detect
+except ImportError:  # детектор необязателен: без него после utf-8 сразу cp1251
+    _detect = None
+
+FALLBACK_ENCODING = "cp1251"
+META_SCAN_BYTES = 4096
+DETECT_SAMPLE_BYTES = 32 * 1024
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+RE_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+RE_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.I)
+
+HOST_ENCODINGS = {}  # host -> кодировка, найденная на одной из его страниц
+_lock = threading.Lock()
+
+
+def normalize_encoding(name):
+    """'Windows-1251' / 'CP1251' -> 'cp1251'; неизвестное -> None."""
+    if isinstance(name, bytes):
+        name = name.decode("ascii", errors="ignore")
+    try:
+        return codecs.lookup(name.strip()).name
+    except (LookupError, AttributeError):
+        return None
+
+
+def declared_encoding(content, content_type=""):
+    """Кодировка, объявленная самим ответом: BOM, заголовок или <meta>."""
+    for bom, enc in BOMS:
+        if content.startswith(bom):
+            return enc
+    m = RE_HEADER_CHARSET.search(content_type or "")
+    if m and normalize_encoding(m.group(1)):
+        return normalize_encoding(m.group(1))
+    m = RE_META_CHARSET.search(content[:META_SCAN_BYTES])
+    if m:
+        return normalize_encoding(m.group(1))
+    return None
+
+
+def detect_sample(content):
+    """Детектор только по первым DETECT_SAMPLE_BYTES байтам; None — не уверен/нет пакета."""
+    if _detect is None:
+        return None
+    best = _detect(content[:DETECT_SAMPLE_BYTES]).best()
+    return normalize_encoding(best.encoding) if best else None
+
+
+def decode_bytes(content, content_type="", host=""):
+    """(text, encoding) для тела ответа."""
+    if not content:
+        return "", None
+    enc = declared_encoding(content, content_type)
+    if enc is None and "json" in (content_type or "").lower():
+        enc = "utf-8"  # RFC 8259: JSON без charset — utf-8
+    if enc not in (None, "utf-8"):
+        text = content.decode(enc, errors="replace")
+    else:
+        # Объявленный utf-8 часто врёт на старых сайтах: проверяем строго
+        try:
+            text = content.decode("utf-8")
+            enc = "utf-8"
+        except UnicodeDecodeError:
+            if enc is None:
+                enc = (HOST_ENCODINGS.get(host) if host else None) or detect_sample(content)
+            else:
+                enc = None
+            if enc in (None, "utf-8", "ascii"):
+                enc = FALLBACK_ENCODING
+            text = content.decode(enc, errors="replace")
+    if host and not enc.startswith("utf"):
+        with _lock:
+            HOST_ENCODINGS.setdefault(host, enc)
+    return text, enc
+
+
+def response_text(r):
+    """Замена r.text для requests.Response."""
+    text, _ = decode_bytes(r.content, r.headers.get("Content-Type", ""),
+                           urlparse(r.url).hostname or "")
+    return text
+
+
+def decode_pdf_text(content):
+    """Текстовые фрагменты PDF: utf-8, иначе cp1251 (а не latin-1, ломавший кириллицу)."""
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode(FALLBACK_ENCODING, errors="ignore")
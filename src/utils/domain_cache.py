@@ -0,0 +1,85 @@
+"""
+Кэш результатов обогащения по хосту сайта (без ведущего www.).
+
+Один и тот же сайт встречается в выгрузке несколько раз (с www и без,
+с путями и utm-метками). Результат обхода первого сайта домена
+запоминается в памяти и в JSON-файле, повторные строки берут его оттуда.
+Пустой результат (сайт не ответил) не запоминается: следующая строка
+домена и следующий запуск пробуют ещё раз.
+Если тот же домен уже обрабатывается другим потоком, второй поток ждёт
+его результата, а не запускает параллельный обход (coalescing).
+"""
+import json
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+def canonical_domain(url):
+    """
+    https://www.Shop.Example.ru:8080/path?utm=1 -> shop.example.ru. Поддомены
+    не схлопываются: a.tilda.ws и b.tilda.ws — разные компании.
+    """
+    s = str(url or "").strip().lower()
+    if not s:
+        return ""
+    if "://" not in s:
+        s = "http://" + s
+    host = (urlparse(s).hostname or "").rstrip(".")
+    return host.removeprefix("www.")
+
+
+class DomainCache:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.results = {}
+        self.inflight = {}
+        self.lock = threading.Lock()
+        if self.path and self.path.exists():
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+                # пустые результаты из старых файлов — тоже на повтор
+                self.results = {k: v for k, v in loaded.items() if v}
+            except (OSError, ValueError) as e:
+                print(f"[WARN] кэш доменов не прочитан ({self.path}): {e}")
+
+    def get_or_compute(self, domain, compute):
+        """
+        (result, from_cache). compute() вызывается не более одного раза
+        на домен, даже если домен запрошен одновременно из нескольких потоков.
+        Пустой result получают только ждавшие потоки; в кэш он не попадает.
+        """
+        with self.lock:
+            if domain in self.results:
+                return self.results[domain], True
+            fut = self.inflight.get(domain)
+            owner = fut is None
+            if owner:
+                fut = self.inflight[domain] = Future()
+        if not owner:
+            return fut.result(), True
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self.lock:
+                del self.inflight[domain]
+            fut.set_exception(e)
+            raise
+        with self.lock:
+            if result:
+                self.results[domain] = result
+            del self.inflight[domain]
+        fut.set_result(result)
+        return result, False
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            payload = json.dumps(self.results, ensure_ascii=False, indent=1)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        tmp.replace(self.path)
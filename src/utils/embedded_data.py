@@ -0,0 +1,191 @@
+"""
+Реквизиты из данных, встроенных в страницу, — без браузера.
+
+Сайты на Next.js/Nuxt/SPA отдают пустой HTML-«каркас», а контакты рисуют
+скриптом из встроенного JSON. Этот JSON уже лежит в скачанной странице:
+
+    <script id="__NEXT_DATA__" type="application/json">        Next.js
+    <script type="application/ld+json">                          schema.org (Organization, ...)
+    itemprop="telephone" / "email" / "address" / "taxID"         микроразметка
+    window.__INITIAL_STATE__ = {...};  window.__NUXT__ = ...      состояние SPA
+
+Если этого мало, скачиваются несколько небольших JSON того же сайта, на
+которые ссылается страница (/api/..., *.json), — сначала «контактные».
+Поля ищутся по ключам (inn/taxID, telephone, email, address, legalName),
+а все строковые значения дополнительно отдаются текстом для регулярок
+контактов. ИНН/ОГРН из этого текста не берутся: id и метки времени в
+состоянии SPA неотличимы от них по виду.
+"""
+import json
+import re
+from urllib.parse import urljoin, urlparse
+
+from utils.site_crawler import same_site, score_link
+
+MAX_NODES = 200_000          # узлов JSON на страницу (__NEXT_DATA__ бывает на мегабайты)
+MAX_TEXT_CHARS = 200_000     # строк JSON для регулярок
+MAX_ENDPOINTS = 3            # JSON-эндпоинтов на сайт
+MAX_ENDPOINT_BYTES = 256 * 1024
+
+# Ключи без регистра, "_" и "-" -> поле CompanyRecord
+KEY_FIELDS = {
+    "inn": "inn", "taxid": "inn", "tin": "inn", "vatid": "inn", "инн": "inn",
+    "ogrn": "ogrn", "огрн": "ogrn",
+    "telephone": "contacts", "phone": "contacts", "phones": "contacts",
+    "tel": "contacts", "phonenumber": "contacts", "mobile": "contacts",
+    "email": "email", "emails": "email", "mail": "email",
+    "address": "address", "streetaddress": "address", "legaladdress": "address",
+    "postaladdress": "address", "адрес": "address",
+    "legalname": "full_name", "fullname": "full_name",
+}
+ADDRESS_PARTS = ("postalCode", "addressRegion", "addressLocality", "streetAddress")
+
+RE_INN = re.compile(r"\d{10}|\d{12}")
+RE_OGRN = re.compile(r"\d{13}|\d{15}")
+RE_EMAIL = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+RE_STATE = re.compile(r"(?:window\.)?__[A-Z][A-Z0-9_]*__\s*=\s*(?=[\[{])")
+RE_QUOTED_URL = re.compile(r"[\"']((?:https?://|/)[^\"'\s<>]+)[\"']")
+SKIP_JSON = re.compile(r"manifest|locale|i18n|translation|lang/|webpack|chunk|build", re.I)
+
+
+def json_blobs(soup):
+    """Все разобранные JSON-объекты страницы (Next.js, JSON-LD, window.__STATE__)."""
+    blobs = []
+    decoder = json.JSONDecoder()
+    for script in soup.find_all("script"):
+        body = script.string or script.get_text() or ""
+        if not body.strip():
+            continue
+        stype = (script.get("type") or "").lower()
+        if script.get("id") == "__NEXT_DATA__" or "json" in stype:
+            try:
+                blobs.append(json.loads(body))
+            except ValueError:
+                pass
+            continue
+        for m in RE_STATE.finditer(body):
+            try:
+                obj, _ = decoder.raw_decode(body, m.end())
+                blobs.append(obj)
+            except ValueError:
+                pass
+    return blobs
+
+
+def microdata(soup):
+    """itemprop -> [значения] со всей страницы (content/href/текст)."""
+    props = {}
+    for el in soup.select("[itemprop]"):
+        value = el.get("content") or el.get("href") or el.get_text(" ", strip=True)
+        if value:
+            props.setdefault(el["itemprop"], []).append(value)
+    return props
+
+
+def _clean(field, value):
+    """Проверенное значение поля или "" (ИНН из цифр, e-mail с @, телефон от 10 цифр)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(int(value))
+    if not isinstance(value, str):
+        return ""
+    value = value.strip()
+    if field == "inn":
+        digits = re.sub(r"\D", "", value)
+        return digits if RE_INN.fullmatch(digits) else ""
+    if field == "ogrn":
+        digits = re.sub(r"\D", "", value)
+        return digits if RE_OGRN.fullmatch(digits) else ""
+    if field == "email":
+        m = RE_EMAIL.search(value.removeprefix("mailto:"))
+        return m.group(0) if m else ""
+    if field == "contacts":
+        value = value.removeprefix("tel:")
+        return value if 10 <= len(re.sub(r"\D", "", value)) <= 15 else ""
+    return value[:300]
+
+
+def walk(obj, found=None, texts=None):
+    """
+    Обход JSON без рекурсии: found — {поле: [значения]} по известным ключам,
+    texts — все строки (для регулярок). Возвращает (found, texts).
+    """
+    found = {} if found is None else found
+    texts = [] if texts is None else texts
+    stack = [(None, obj)]
+    nodes = chars = 0
+    while stack and nodes < MAX_NODES:
+        key, value = stack.pop()
+        nodes += 1
+        field = KEY_FIELDS.get(key.lower().replace("_", "").replace("-", "")) if key else None
+        if isinstance(value, dict):
+            if field == "address" and any(p in value for p in ADDRESS_PARTS):
+                # schema.org PostalAddress -> одна строка
+                value_str = ", ".join(str(value[p]) for p in ADDRESS_PARTS if value.get(p))
+                found.setdefault("address", []).append(value_str)
+            stack.extend(reversed([(k, v) for k, v in value.items() if isinstance(k, str)]))
+        elif isinstance(value, list):
+            stack.extend((key, v) for v in reversed(value))
+        else:
+            if field:
+                clean = _clean(field, value)
+                if clean:
+                    found.setdefault(field, []).append(clean)
+            if isinstance(value, str) and chars < MAX_TEXT_CHARS:
+                texts.append(value)
+                chars += len(value)
+    return found, texts
+
+
+def json_endpoints(html, page_url, root):
+    """Небольшие JSON того же сайта, на которые ссылается страница; «контактные» — первыми."""
+    seen, out = set(), []
+    for m in RE_QUOTED_URL.finditer(html or ""):
+        url = urljoin(page_url, m.group(1))
+        path = urlparse(url).path
+        if not (path.endswith(".json") or "/api/" in path):
+            continue
+        if url in seen or not same_site(url, root) or SKIP_JSON.search(path):
+            continue
+        seen.add(url)
+        out.append((score_link(url, ""), len(out), url))
+    return [url for _, _, url in sorted(out, key=lambda t: (-t[0], t[1]))]
+
+
+def to_fields(found):
+    """{поле: [значения]} -> значения для CompanyRecord.merge (как в extract_contacts)."""
+    fields = {}
+    for field, values in found.items():
+        values = list(dict.fromkeys(values))
+        if field in ("contacts", "email"):
+            fields[field] = "; ".join(sorted(set(values)))
+        else:
+            fields[field] = values[0]
+    return fields
+
+
+def extract_embedded(soup, html, page_url, root=None, fetch=None,
+                     max_endpoints=MAX_ENDPOINTS, done=None):
+    """
+    (fields, text) по встроенным данным страницы. fetch(url) -> текст или None
+    (не больше MAX_ENDPOINT_BYTES) включает догрузку JSON-эндпоинтов, пока
+    done(fields) не станет True.
+    """
+    root = root or page_url
+    found, texts = {}, []
+    for blob in json_blobs(soup):
+        walk(blob, found, texts)
+    walk(microdata(soup), found, texts)
+
+    if fetch is not None and max_endpoints and not (done and done(to_fields(found))):
+        for url in json_endpoints(html, page_url, root)[:max_endpoints]:
+            body = fetch(url)
+            if not body:
+                continue
+            try:
+                walk(json.loads(body), found, texts)
+            except ValueError:
+                continue
+            print(f"   [EMBEDDED] {url}")
+            if done and done(to_fields(found)):
+                break
+    return to_fields(found), "\n".join(texts)
@@ -0,0 +1,272 @@
+"""
+Локальный «интернет» из синтетических сайтов агентств для нагрузочных прогонов.
+
+Каждая компания — отдельный хост 127.0.X.Y (Linux отдаёт весь 127/8 на lo;
+на macOS адреса нужно добавить: `sudo ifconfig lo0 alias 127.0.1.1`),
+поэтому обход, кэш доменов и корень сайта работают как на реальных сайтах.
+Сервер один (aiohttp, один event loop), страница выбирается по заголовку Host.
+
+Профили сайтов (детерминированно по seed и номеру компании):
+
+    plain     реквизиты на главной
+    contacts  реквизиты на /contacts, на главной только ссылки
+    spa       пустой каркас + __NEXT_DATA__ (как у Next.js)
+    pdf       реквизиты только в /docs/requisites.pdf (ссылка + sitemap.xml)
+    broken    любой запрос -> 500
+
+Хост 127.0.0.2 изображает directline: /recommend/N -> 302 -> /dl/N -> 302 ->
+/lander/N, где ссылка с rurl= на сайт компании.
+
+Неполадки на каждый запрос: задержка (логнормальная, медиана и sigma),
+доля 503 и доля slow-loris ответов (тело по 64 байта в течение N секунд).
+
+    python src/utils/mock_web.py serve --companies 200 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+
+DIRECTLINE_HOST = "127.0.0.2"
+DEFAULT_PORT = 8800
+PROFILE_WEIGHTS = {"plain": 3, "contacts": 3, "spa": 2, "pdf": 1, "broken": 1}
+CITIES = ("Москва", "Санкт-Петербург", "Казань", "Екатеринбург", "Новосибирск")
+STREETS = ("ул. Ленина", "Тверская ул.", "Невский пр-т", "ул. Гагарина", "ул. Мира")
+SLOWLORIS_CHUNK = 64
+
+
+def host_for(i):
+    """Номер компании -> адрес 127.0.X.Y (до 250 * 250 компаний)."""
+    return f"127.0.{1 + i // 250}.{1 + i % 250}"
+
+
+def site_url(i, port=DEFAULT_PORT):
+    return f"http://{host_for(i)}:{port}/"
+
+
+def recommend_url(i, port=DEFAULT_PORT):
+    return f"http://{DIRECTLINE_HOST}:{port}/recommend/{i}"
+
+
+def company(i, seed=0):
+    """Синтетические реквизиты компании i — их же ожидает драйвер прогона."""
+    rnd = random.Random(f"{seed}:{i}")
+    profile = rnd.choices(list(PROFILE_WEIGHTS), weights=list(PROFILE_WEIGHTS.values()))[0]
+    city = rnd.choice(CITIES)
+    return {
+        "index": i,
+        "host": host_for(i),
+        "profile": profile,
+        "name": f"Агентство {i}",
+        "full_name": f"ООО «Агентство {i}»",
+        "inn": str(rnd.randint(10**9, 10**10 - 1)),
+        "ogrn": str(rnd.randint(10**12, 10**13 - 1)),
+        "phone": f"+7 (495) {rnd.randint(100, 999)}-{rnd.randint(10, 99)}-{rnd.randint(10, 99)}",
+        "email": f"info@agency{i}.ru",
+        "region": city,
+        "address": f"г. {city}, {rnd.choice(STREETS)}, д. {rnd.randint(1, 120)}",
+    }
+
+
+def _requisites_html(c):
+    return (f"<p>{c['full_name']}</p><p>ИНН {c['inn']} ОГРН {c['ogrn']}</p>"
+            f"<p>Тел.: {c['phone']}, e-mail: {c['email']}</p>"
+            f"<p>Адрес: {c['address']}</p>")
+
+
+def _page(title, body, page_kb=0):
+    filler = "<p>" + "Полный цикл BTL, промо и event-маркетинга. " * 20 + "</p>"
+    padding = filler * max(0, (page_kb * 1024) // len(filler.encode("utf-8")))
+    return (f"<!doctype html><html><head><meta charset=\"utf-8\"><title>{title}</title></head>"
+            f"<body>{body}{padding}</body></html>")
+
+
+def _pdf(c):
+    text = f"{c['full_name']}\nИНН {c['inn']}\nОГРН {c['ogrn']}\nАдрес: {c['address']}\n"
+    return b"%PDF-1.4\n" + text.encode("cp1251") + b"\n%%EOF\n"
+
+
+def site_pages(c, page_kb=0, port=DEFAULT_PORT):
+    """path -> (status, content_type, body bytes) для сайта компании."""
+    name = c["name"]
+    nav = ('<nav><a href="/about">О компании</a> <a href="/contacts">Контакты</a> '
+           '<a href="/services">Услуги</a></nav>')
+    pages = {
+        "/about": _page(name, f"<h1>О компании {name}</h1>{nav}", page_kb),
+        "/services": _page(name, f"<h1>Услуги</h1>{nav}", page_kb),
+    }
+    sitemap = ["/", "/about", "/services", "/contacts"]
+    p = c["profile"]
+    if p == "plain":
+        pages["/"] = _page(name, f"<h1>{name}</h1>{nav}{_requisites_html(c)}", page_kb)
+        pages["/contacts"] = _page(name, f"<h1>Контакты</h1>{nav}<p>{c['phone']}</p>")
+    elif p == "contacts":
+        pages["/"] = _page(name, f"<h1>{name}</h1>{nav}", page_kb)
+        pages["/contacts"] = _page(name, f"<h1>Контакты и реквизиты</h1>{nav}{_requisites_html(c)}")
+    elif p == "spa":
+        data = {"props": {"pageProps": {"company": {
+            "legalName": c["full_name"], "inn": c["inn"], "ogrn": c["ogrn"],
+            "phone": c["phone"], "email": c["email"], "address": c["address"]}}}}
+        pages["/"] = ('<!doctype html><html><head><meta charset="utf-8"></head><body><div id="__next"></div>'
+                      '<script id="__NEXT_DATA__" type="application/json">'
+                      + json.dumps(data, ensure_ascii=False) + "</script></body></html>")
+    elif p == "pdf":
+        pages["/"] = _page(name, f'<h1>{name}</h1>{nav}<a href="/docs/requisites.pdf">Реквизиты</a>',
+                           page_kb)
+        pages["/contacts"] = _page(name, f"<h1>Контакты</h1>{nav}<p>{c['phone']}</p>")
+        sitemap.append("/docs/requisites.pdf")
+    out = {path: (200, "text/html; charset=utf-8", html.encode("utf-8"))
+           for path, html in pages.items()}
+    base = f"http://{c['host']}:{port}"
+    locs = "".join(f"<url><loc>{base}{path}</loc></url>" for path in sitemap)
+    out["/sitemap.xml"] = (200, "application/xml",
+                           f'<?xml version="1.0"?><urlset>{locs}</urlset>'.encode())
+    if p == "pdf":
+        out["/docs/requisites.pdf"] = (200, "application/pdf", _pdf(c))
+    return out
+
+
+class MockWeb:
+    def __init__(self, companies=100, port=DEFAULT_PORT, seed=0, latency_ms=50.0,
+                 latency_sigma=0.5, error_rate=0.0, slowloris_rate=0.0,
+                 slowloris_seconds=5.0, page_kb=20):
+        self.companies = [company(i, seed) for i in range(companies)]
+        self.by_host = {c["host"]: c for c in self.companies}
+        self.port = port
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.slowloris_rate = slowloris_rate
+        self.slowloris_seconds = slowloris_seconds
+        self.page_kb = page_kb
+        self.rnd = random.Random(seed)
+        self._pages = {}  # host -> site_pages(), строятся при первом запросе
+        self.runner = None
+
+    def _delay(self):
+        if self.latency_ms <= 0:
+            return 0.0
+        # логнормальное: медиана latency_ms, хвост задаётся sigma
+        return self.latency_ms / 1000 * math.exp(self.rnd.gauss(0, self.latency_sigma))
+
+    async def handle(self, request):
+        from aiohttp import web
+
+        host = request.host.split(":")[0]
+        await asyncio.sleep(self._delay())
+        if self.rnd.random() < self.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+
+        if host == DIRECTLINE_HOST:
+            status, ctype, body, location = self._directline(request.path)
+            if location:
+                raise web.HTTPFound(location)
+        else:
+            c = self.by_host.get(host)
+            if c is None:
+                return web.Response(status=404)
+            if c["profile"] == "broken":
+                return web.Response(status=500, text="Internal Server Error")
+            pages = self._pages.get(host)
+            if pages is None:
+                pages = self._pages[host] = site_pages(c, self.page_kb, self.port)
+            status, ctype, body = pages.get(request.path, (404, "text/html", b"<h1>404</h1>"))
+
+        if request.method == "HEAD" or self.rnd.random() >= self.slowloris_rate:
+            return web.Response(status=status, body=body, headers={"Content-Type": ctype})
+        return await self._slowloris(request, status, ctype, body)
+
+    def _directline(self, path):
+        """(status, ctype, body, redirect) для цепочки recommend -> dl -> lander."""
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[1].isdigit():
+            i = int(parts[1])
+            if parts[0] == "recommend":
+                return 302, "", b"", f"/dl/{i}"
+            if parts[0] == "dl":
+                return 302, "", b"", f"/lander/{i}"
+            if parts[0] == "lander" and i < len(self.companies):
+                target = site_url(i, self.port)
+                html = f'<html><body><a href="/go?rurl={target}&utm=dl">Перейти на сайт</a></body></html>'
+                return 200, "text/html; charset=utf-8", html.encode(), None
+        return 404, "text/html", b"<h1>404</h1>", None
+
+    async def _slowloris(self, request, status, ctype, body):
+        """Заголовки сразу, тело по SLOWLORIS_CHUNK байт в течение slowloris_seconds."""
+        from aiohttp import web
+
+        resp = web.StreamResponse(status=status, headers={"Content-Type": ctype})
+        resp.content_length = len(body)
+        await resp.prepare(request)
+        chunks = [body[k:k + SLOWLORIS_CHUNK] for k in range(0, len(body), SLOWLORIS_CHUNK)] or [b""]
+        pause = self.slowloris_seconds / len(chunks)
+        for chunk in chunks:
+            await resp.write(chunk)
+            await asyncio.sleep(pause)
+        await resp.write_eof()
+        return resp
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        for host in [DIRECTLINE_HOST, *self.by_host]:
+            await web.TCPSite(self.runner, host, self.port).start()
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def serve(mock):
+    await mock.start()
+    # строка готовности читается драйвером (src/loadtest.py)
+    print(f"READY {len(mock.companies)} sites on port {mock.port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await mock.stop()
+
+
+def add_mock_args(ap):
+    """Параметры мок-веба — общие для serve и драйвера нагрузки."""
+    ap.add_argument("--companies", type=int, default=100)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="медиана задержки ответа")
+    ap.add_argument("--latency-sigma", type=float, default=0.5, help="sigma логнормальной задержки")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    ap.add_argument("--slowloris-rate", type=float, default=0.0, help="доля медленных ответов")
+    ap.add_argument("--slowloris-seconds", type=float, default=5.0)
+    ap.add_argument("--page-kb", type=int, default=20, help="размер HTML-страниц, КБ")
+
+
+def mock_argv(args):
+    """Обратно в аргументы командной строки (для запуска сервера подпроцессом)."""
+    return [
+        "--companies", str(args.companies), "--port", str(args.port), "--seed", str(args.seed),
+        "--latency-ms", str(args.latency_ms), "--latency-sigma", str(args.latency_sigma),
+        "--error-rate", str(args.error_rate), "--slowloris-rate", str(args.slowloris_rate),
+        "--slowloris-seconds", str(args.slowloris_seconds), "--page-kb", str(args.page_kb),
+    ]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="mock_web")
+    sub = ap.add_subparsers(dest="command", required=True)
+    add_mock_args(sub.add_parser("serve", help="поднять мок-веб до Ctrl+C"))
+    args = ap.parse_args(argv)
+    mock = MockWeb(args.companies, args.port, args.seed, args.latency_ms, args.latency_sigma,
+                   args.error_rate, args.slowloris_rate, args.slowloris_seconds, args.page_kb)
+    try:
+        asyncio.run(serve(mock))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
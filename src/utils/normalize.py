@@ -0,0 +1,131 @@
+"""
+Векторные нормализаторы значений: работают сразу по колонке DataFrame
+(pandas .str / regex), а не построчно в Python.
+"""
+import numpy as np
+import pandas as pd
+
+RE_NUMBER = r"(\d+(?:[.,]\d+)?)"
+RE_EMAIL = r"([a-z0-9_.+-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)+)"
+# Номер целиком (как RE_PHONE в INN_OGRN_finding) + городской без кода страны
+# и зарубежный +<11-15 цифр>; добавочные "доб. 123" в номер не попадают
+RE_PHONE = (
+    r"(?:\+7|\b8)\s?\(?\d{3}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2}(?!\d)"
+    r"|\(?\b[3489]\d{2}\)?[\s\-]?\d{3}[\s\-]?\d{2}[\s\-]?\d{2}(?!\d)"
+    r"|\+[1-9](?:[\s\-()]?\d){10,14}(?!\d)"
+)
+# Выручка в млн из data/final: до 5 цифр и 1-2 знака после запятой/точки
+RE_MLN = r"\d{1,5}[.,]\d{1,2}"
+LIST_SEP = "; "
+
+# Город -> субъект РФ (ключи в нижнем регистре, ё -> е, без "г.")
+CITY_REGIONS = {
+    "москва": "Москва",
+    "мск": "Москва",
+    "санкт-петербург": "Санкт-Петербург",
+    "санкт петербург": "Санкт-Петербург",
+    "петербург": "Санкт-Петербург",
+    "спб": "Санкт-Петербург",
+    "екатеринбург": "Свердловская область",
+    "новосибирск": "Новосибирская область",
+    "казань": "Республика Татарстан",
+    "нижний новгород": "Нижегородская область",
+    "краснодар": "Краснодарский край",
+    "сочи": "Краснодарский край",
+    "ростов-на-дону": "Ростовская область",
+    "самара": "Самарская область",
+    "уфа": "Республика Башкортостан",
+    "пермь": "Пермский край",
+    "воронеж": "Воронежская область",
+    "волгоград": "Волгоградская область",
+    "челябинск": "Челябинская область",
+    "омск": "Омская область",
+    "красноярск": "Красноярский край",
+    "тюмень": "Тюменская область",
+    "калининград": "Калининградская область",
+    "владивосток": "Приморский край",
+}
+
+
+def _text(series):
+    return series.fillna("").astype(str).str.lower().str.replace(r"\s+", "", regex=True)
+
+
+def revenue_to_int(series):
+    """
+    "986,9 млн" -> 986900000, "1,1 млрд" -> 1100000000, "227 300 000" -> 227300000.
+    Без единиц короткое дробное (RE_MLN) — миллионы, как в data/final:
+    "986,9" и "986.9" -> 986900000. Остальное без единиц — число рублей как
+    есть ("986900000.0", "2 500 000,00" -> 2500000), иначе все цифры строки;
+    пусто/мусор -> <NA>.
+    """
+    s = _text(series)
+    number = pd.to_numeric(s.str.extract(RE_NUMBER)[0].str.replace(",", ".", regex=False),
+                           errors="coerce")
+    mult = pd.Series(
+        np.select([s.str.contains("млрд", regex=False), s.str.contains("млн", regex=False),
+                   s.str.fullmatch(RE_MLN)],
+                  [1_000_000_000, 1_000_000, 1_000_000], default=np.nan),
+        index=s.index,
+    )
+    # "986900000.0" после float-колонки CSV — это число, а не набор цифр
+    plain = pd.to_numeric(s.str.replace(",", ".", regex=False), errors="coerce")
+    digits = pd.to_numeric(s.str.replace(r"\D", "", regex=True).replace("", np.nan),
+                           errors="coerce")
+    out = (number * mult).where(mult.notna(), plain.where(plain.notna(), digits))
+    return out.round().astype("Int64")
+
+
+def first_int(series):
+    """Первое целое в строке: "около 300 человек" -> 300 (штат и т.п.)."""
+    return pd.to_numeric(_text(series).str.extract(r"(\d+)")[0], errors="coerce").astype("Int64")
+
+
+def year(series):
+    """Год 19xx/20xx из строки: "Основана в 1996 г." -> 1996."""
+    return pd.to_numeric(_text(series).str.extract(r"((?:19|20)\d{2})")[0],
+                         errors="coerce").astype("Int64")
+
+
+def _join_unique(exploded, sep=LIST_SEP):
+    """Обратно из explode: уникальные непустые значения строки через sep."""
+    exploded = exploded[exploded.notna() & (exploded != "")]
+    return exploded.groupby(level=0).agg(lambda v: sep.join(dict.fromkeys(v)))
+
+
+def phones_e164(series):
+    """
+    "Тел.: +7 (495) 789-45-42 Факс: 8 495 916-01-23" -> "+74957894542; +74959160123".
+    Номера ищутся по RE_PHONE, а не разбиением строки: разделители бывают
+    любыми, а "доб. 123" не должен прилипать к номеру. Российские 10/11-значные
+    приводятся к +7XXXXXXXXXX, зарубежные — к +<цифры>.
+    """
+    parts = series.fillna("").astype(str).str.findall(RE_PHONE).explode()
+    d = parts.fillna("").str.replace(r"\D", "", regex=True)
+    ru11 = (d.str.len() == 11) & d.str[0].isin(["7", "8"])
+    ru10 = (d.str.len() == 10) & d.str[0].isin(["3", "4", "8", "9"])
+    e164 = pd.Series(np.select(
+        [ru11, ru10, d.str.len().between(11, 15)],
+        ["+7" + d.str[1:], "+7" + d, "+" + d],
+        default="",
+    ), index=d.index)
+    return _join_unique(e164).reindex(series.index, fill_value="")
+
+
+def emails_clean(series):
+    """Все адреса в нижнем регистре, без дублей, через "; "."""
+    found = series.fillna("").astype(str).str.lower().str.findall(RE_EMAIL).explode()
+    return _join_unique(found.str.strip(".")).reindex(series.index, fill_value="")
+
+
+def region_from_city(series):
+    """
+    Город/строка региона -> субъект РФ по CITY_REGIONS. Каждая часть через
+    запятую заменяется отдельно, неизвестные остаются как были:
+    "г. Москва, Тамбов" -> "Москва, Тамбов".
+    """
+    raw = series.fillna("").astype(str).str.strip()
+    parts = raw.str.split(",").explode().str.strip(" .")
+    key = (parts.str.lower().str.replace("ё", "е", regex=False)
+                .str.replace(r"^г\.?\s*", "", regex=True))
+    return _join_unique(key.map(CITY_REGIONS).fillna(parts), sep=", ").reindex(raw.index, fill_value="")
@@ -0,0 +1,206 @@
+"""
+Опциональное профилирование по сайтам.
+
+Включается переменной окружения (или `python -m btl --profile [--profile-path PATH] ...`):
+
+    BTL_PROFILE=data/profile/spans.jsonl        # куда писать записи
+    BTL_PROFILE_CPROFILE=1                      # + cProfile на каждый сайт
+
+Каждый сайт оборачивается в PROFILER.site(url), внутри которого участки
+кода помечены спанами fetch / parse / regex / ner / save. Время спана
+исключительное: вложенный спан вычитается из родителя, поэтому сумма
+по спанам не превышает общее время сайта, а остаток попадает в "other".
+Состояние хранится в contextvars — работает и в потоках, и в asyncio-задачах.
+
+Отчёт по самым медленным сайтам:
+
+    python src/utils/profiling.py report data/profile/spans.jsonl --top 10
+"""
+import argparse
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SPANS = ("fetch", "parse", "regex", "ner", "save")
+
+_current = contextvars.ContextVar("btl_profile_site", default=None)
+
+
+class _SiteState:
+    __slots__ = ("site", "spans", "stack")
+
+    def __init__(self, site):
+        self.site = site
+        self.spans = {}
+        self.stack = []  # [name, start, child_time]
+
+
+class SiteProfiler:
+    def __init__(self, path=None, use_cprofile=False, top_functions=15):
+        self.path = Path(path) if path else None
+        self.use_cprofile = use_cprofile
+        self.top_functions = top_functions
+        self._lock = threading.Lock()
+        self._cprofile_busy = threading.local()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("BTL_PROFILE") or None,
+            use_cprofile=os.environ.get("BTL_PROFILE_CPROFILE") == "1",
+        )
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    @contextmanager
+    def site(self, site):
+        if not self.enabled:
+            yield
+            return
+        state = _SiteState(site)
+        token = _current.set(state)
+        # Один cProfile на поток: сайты, идущие параллельно в одном event loop,
+        # получают только спаны (второй профайлер подменил бы/сломал первый)
+        prof = None
+        if self.use_cprofile and not getattr(self._cprofile_busy, "on", False):
+            prof = cProfile.Profile()
+            self._cprofile_busy.on = True
+        t0 = time.perf_counter()
+        if prof:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+                self._cprofile_busy.on = False
+            total = time.perf_counter() - t0
+            _current.reset(token)
+            self._write(site, total, state.spans, prof)
+
+    @contextmanager
+    def span(self, name, site=None):
+        """
+        Участок внутри текущего сайта. С site=... пишется отдельная запись
+        (например, сохранение CSV, которое происходит вне обработки сайта).
+        """
+        if not self.enabled:
+            yield
+            return
+        if site is not None:
+            t0 = time.perf_counter()
+            try:
+                yield
+            finally:
+                dt = time.perf_counter() - t0
+                self._write(site, dt, {name: dt}, None)
+            return
+        state = _current.get()
+        if state is None:
+            yield
+            return
+        frame = [name, time.perf_counter(), 0.0]
+        state.stack.append(frame)
+        try:
+            yield
+        finally:
+            state.stack.pop()
+            dt = time.perf_counter() - frame[1]
+            state.spans[name] = state.spans.get(name, 0.0) + dt - frame[2]
+            if state.stack:
+                state.stack[-1][2] += dt
+
+    def timed(self, name):
+        """Декоратор: вся функция — спан name."""
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    def _write(self, site, total, spans, prof):
+        rec = {
+            "site": site,
+            "ts": time.time(),
+            "total": round(total, 6),
+            "spans": {k: round(v, 6) for k, v in spans.items()},
+        }
+        if prof:
+            rec["functions"] = self._top_functions(prof)
+            dump_dir = self.path.with_name(self.path.stem + "_prof")
+            dump_dir.mkdir(parents=True, exist_ok=True)
+            prof.dump_stats(dump_dir / (re.sub(r"[^\w.-]+", "_", site)[:120] + ".prof"))
+        line = json.dumps(rec, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _top_functions(self, prof):
+        stats = pstats.Stats(prof, stream=io.StringIO())
+        rows = []
+        for (file, line, func), (_cc, _nc, tt, ct, _callers) in stats.stats.items():
+            rows.append({"func": f"{Path(file).name}:{line}:{func}",
+                         "tottime": round(tt, 6), "cumtime": round(ct, 6)})
+        rows.sort(key=lambda r: r["cumtime"], reverse=True)
+        return rows[: self.top_functions]
+
+
+PROFILER = SiteProfiler.from_env()
+
+
+def load_report(path):
+    """Записи JSONL -> {site: {"total": .., "spans": {..}}} (повторы сайта суммируются)."""
+    sites = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            agg = sites.setdefault(rec["site"], {"total": 0.0, "spans": {}})
+            agg["total"] += rec["total"]
+            for k, v in rec["spans"].items():
+                agg["spans"][k] = agg["spans"].get(k, 0.0) + v
+    return sites
+
+
+def format_report(sites, top=10):
+    cols = list(SPANS) + sorted({k for s in sites.values() for k in s["spans"]} - set(SPANS))
+    head = f"{'site':<45} {'total':>8} " + " ".join(f"{c:>8}" for c in cols) + f" {'other':>8}"
+    lines = [head, "-" * len(head)]
+    ranked = sorted(sites.items(), key=lambda kv: kv[1]["total"], reverse=True)[:top]
+    for site, agg in ranked:
+        other = agg["total"] - sum(agg["spans"].values())
+        lines.append(
+            f"{site[:45]:<45} {agg['total']:>8.2f} "
+            + " ".join(f"{agg['spans'].get(c, 0.0):>8.2f}" for c in cols)
+            + f" {max(other, 0.0):>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="profiling")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("report", help="top-N самых медленных сайтов")
+    p.add_argument("path")
+    p.add_argument("--top", type=int, default=10)
+    args = ap.parse_args(argv)
+    print(format_report(load_report(args.path), args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Локальный индекс реестра юрлиц (выгрузка ЕГРЮЛ / открытые данные ФНС).
+
+Дамп (XML в формате ЕГРЮЛ или CSV) один раз загружается в компактный
+SQLite-файл с таблицами по ИНН/ОГРН, ключу названия и домену. Ключ
+названия — отсортированные токены без организационно-правовой формы,
+поэтому поиск строки по названию/региону/сайту — один индексированный
+SELECT вместо обхода сайта.
+
+Сборка индекса:
+    python src/utils/registry_index.py build data/registry/egrul.xml data/registry/egrul_index.sqlite
+Проверка:
+    python src/utils/registry_index.py lookup data/registry/egrul_index.sqlite "ЛБЛ Проект" Москва
+"""
+import csv
+import re
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from export import sniff_csv
+
+LEGAL_FORMS = {
+    "ооо", "оао", "зао", "пао", "ао", "ип", "нко", "ано",
+    "общество", "с", "ограниченной", "ответственностью",
+    "акционерное", "публичное", "закрытое", "открытое",
+    "индивидуальный", "предприниматель",
+    "llc", "ltd", "inc", "group",
+}
+RE_TOKEN = re.compile(r"[a-zа-я0-9]+", re.U)
+
+# Синонимы колонок CSV-дампа -> поле индекса
+CSV_COLUMNS = {
+    "inn": ("inn", "инн"),
+    "ogrn": ("ogrn", "огрн"),
+    "full_name": ("full_name", "name_full", "наимюлполн", "полное наименование"),
+    "short_name": ("short_name", "name", "наимюлсокр", "сокращенное наименование"),
+    "region": ("region", "регион", "наимрегион"),
+    "address": ("address", "адрес"),
+    "site": ("site", "domain", "сайт"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    inn TEXT, ogrn TEXT, full_name TEXT, short_name TEXT,
+    region TEXT, address TEXT
+);
+CREATE TABLE IF NOT EXISTS names (name_key TEXT, region_key TEXT, company_id INTEGER);
+CREATE TABLE IF NOT EXISTS domains (domain TEXT, company_id INTEGER);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_names ON names(name_key);
+CREATE INDEX IF NOT EXISTS ix_domains ON domains(domain);
+CREATE INDEX IF NOT EXISTS ix_inn ON companies(inn);
+CREATE INDEX IF NOT EXISTS ix_ogrn ON companies(ogrn);
+"""
+
+
+def normalize_name(name):
+    """Нижний регистр, ё->е, без кавычек и организационно-правовой формы."""
+    s = str(name or "").lower().replace("ё", "е")
+    return [t for t in RE_TOKEN.findall(s) if t not in LEGAL_FORMS]
+
+
+def name_key(name):
+    """Ключ для точного совпадения названия: "ООО «ЛБЛ Проект»" -> "лбл проект"."""
+    return " ".join(sorted(set(normalize_name(name))))
+
+
+def normalize_region(region):
+    s = str(region or "").lower().replace("ё", "е")
+    s = re.sub(r"^\s*г\.?\s+", "", s)
+    return " ".join(RE_TOKEN.findall(s))
+
+
+def normalize_domain(site):
+    s = str(site or "").strip().lower()
+    if not s:
+        return ""
+    if "://" not in s:
+        s = "http://" + s
+    host = urlparse(s).netloc.split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+# ---- чтение дампов
+def iter_csv_dump(path):
+    # выгрузки ФНС бывают и в utf-8 (с BOM), и в cp1251
+    encoding, delimiter = sniff_csv(path)
+    if encoding == "utf-8":
+        encoding = "utf-8-sig"
+    with open(path, encoding=encoding, newline="") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        mapping = {}
+        for field, aliases in CSV_COLUMNS.items():
+            for col in reader.fieldnames or []:
+                if col.strip().lower() in aliases:
+                    mapping[field] = col
+                    break
+        for row in reader:
+            yield {field: (row.get(col) or "").strip() for field, col in mapping.items()}
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_xml_dump(path):
+    """
+    Потоковый разбор XML ЕГРЮЛ: каждый <СвЮЛ ИНН=.. ОГРН=..> -> запись.
+    Обработанные элементы очищаются, поэтому память не растёт с размером дампа.
+    """
+    for _, el in ET.iterparse(path, events=("end",)):
+        if _local(el.tag) != "СвЮЛ":
+            continue
+        rec = {"inn": el.get("ИНН", ""), "ogrn": el.get("ОГРН", "")}
+        for sub in el.iter():
+            tag = _local(sub.tag)
+            if tag == "СвНаимЮЛ":
+                rec["full_name"] = sub.get("НаимЮЛПолн", "")
+            elif tag == "СвНаимЮЛСокр":
+                rec["short_name"] = sub.get("НаимСокр", "")
+            elif tag == "Регион" and not rec.get("region"):
+                rec["region"] = sub.get("НаимРегион", "")
+            elif tag == "АдресРФ" and not rec.get("address"):
+                rec["address"] = ", ".join(
+                    v for k, v in sub.attrib.items() if k not in ("КодРегион", "Индекс")
+                )
+        el.clear()
+        yield rec
+
+
+def iter_dump(path):
+    path = Path(path)
+    if path.suffix.lower() == ".xml":
+        return iter_xml_dump(path)
+    return iter_csv_dump(path)
+
+
+# ---- индекс
+def build_index(dump_paths, index_path, batch=10_000):
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    if index_path.exists():
+        index_path.unlink()
+    con = sqlite3.connect(index_path)
+    con.executescript(SCHEMA)
+    companies, names, domains = [], [], []
+    next_id = 1
+
+    def flush():
+        con.executemany("INSERT INTO companies VALUES (?,?,?,?,?,?,?)", companies)
+        con.executemany("INSERT INTO names VALUES (?,?,?)", names)
+        con.executemany("INSERT INTO domains VALUES (?,?)", domains)
+        companies.clear(); names.clear(); domains.clear()
+
+    for dump in dump_paths:
+        for rec in iter_dump(dump):
+            if not (rec.get("inn") or rec.get("ogrn")):
+                continue
+            cid = next_id
+            next_id += 1
+            companies.append((
+                cid, rec.get("inn", ""), rec.get("ogrn", ""),
+                rec.get("full_name", ""), rec.get("short_name", ""),
+                rec.get("region", ""), rec.get("address", ""),
+            ))
+            region_key = normalize_region(rec.get("region"))
+            keys = {name_key(rec.get("full_name")), name_key(rec.get("short_name"))} - {""}
+            names.extend((key, region_key, cid) for key in keys)
+            domain = normalize_domain(rec.get("site"))
+            if domain:
+                domains.append((domain, cid))
+            if len(companies) >= batch:
+                flush()
+    flush()
+    con.executescript(INDEXES)
+    con.commit()
+    con.close()
+    print(f"[INFO] Индекс реестра: {next_id - 1} записей -> {index_path}")
+
+
+class RegistryIndex:
+    """Поиск по готовому индексу. Совпадение засчитывается только если оно однозначно."""
+
+    FIELDS = ("inn", "ogrn", "full_name", "short_name", "region", "address")
+
+    def __init__(self, index_path):
+        self.con = sqlite3.connect(f"file:{Path(index_path).as_posix()}?mode=ro", uri=True)
+        if not self.con.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'names'").fetchone():
+            self.con.close()
+            raise ValueError(f"{index_path}: индекс старого формата, пересоберите его (build)")
+
+    def close(self):
+        self.con.close()
+
+    def _select(self, join, where, params):
+        cols = ", ".join(f"c.{f}" for f in self.FIELDS)
+        cur = self.con.execute(
+            f"SELECT DISTINCT {cols} FROM {join} JOIN companies c ON c.id = t.company_id "
+            f"WHERE {where}", params,
+        )
+        return [dict(zip(self.FIELDS, r)) for r in cur]
+
+    def by_domain(self, site):
+        domain = normalize_domain(site)
+        if not domain:
+            return []
+        return self._select("domains t", "t.domain = ?", (domain,))
+
+    def by_name(self, name, region=""):
+        """
+        Строки с тем же набором токенов названия (полного или краткого), что и
+        name. С регионом — только строки этого региона, без откатов на остальные.
+        """
+        key = name_key(name)
+        if not key:
+            return []
+        region_n = normalize_region(region)
+        if not region_n:
+            return self._select("names t", "t.name_key = ?", (key,))
+        # регион записи и запроса могут быть записаны короче/длиннее друг друга
+        return self._select(
+            "names t",
+            "t.name_key = ? AND t.region_key != '' "
+            "AND (instr(t.region_key, ?) > 0 OR instr(?, t.region_key) > 0)",
+            (key, region_n, region_n),
+        )
+
+    def resolve(self, name="", region="", site=""):
+        """
+        Вернуть dict реквизитов или None, если совпадений нет или их несколько.
+        Совпадение только по названию принимается, если с ним согласен домен
+        (несколько юрлиц на одном домене) или регион.
+        """
+        by_domain = self.by_domain(site)
+        if len(by_domain) == 1:
+            return by_domain[0]
+        if by_domain:
+            candidates = [r for r in self.by_name(name, region) if r in by_domain]
+        elif normalize_region(region):
+            candidates = self.by_name(name, region)
+        else:
+            return None
+        return candidates[0] if len(candidates) == 1 else None
+
+def main(argv):
+    if len(argv) >= 3 and argv[0] == "build":
+        build_index(argv[1:-1], argv[-1])
+    elif len(argv) >= 3 and argv[0] == "lookup":
+        idx = RegistryIndex(argv[1])
+        region = argv[3] if len(argv) > 3 else ""
+        print(idx.resolve(name=argv[2], region=region) or "not found")
+        idx.close()
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
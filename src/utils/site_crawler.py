@@ -0,0 +1,167 @@
+"""
+Ограниченный обход сайта в ширину с приоритетной очередью.
+
+Реквизиты обычно лежат на /contacts, /about, /rekvizity — а не на главной.
+Ссылки того же домена оцениваются по тексту анкора и пути URL, и сначала
+скачиваются самые «реквизитные» страницы. Обход останавливается по лимиту
+страниц/байт или когда вызывающий код сообщает, что всё нужное найдено.
+"""
+import heapq
+import re
+from urllib.parse import urljoin, urldefrag, urlparse, urlunparse, parse_qsl, urlencode
+
+from bs4 import BeautifulSoup
+
+from utils.decoding import decode_bytes
+
+# Вес ключевых слов в тексте ссылки / пути (больше — раньше)
+ANCHOR_KEYWORDS = {
+    "реквизит": 10,
+    "контакт": 8,
+    "о компании": 6,
+    "о нас": 6,
+    "компания": 3,
+    "документ": 3,
+    "политик": 2,
+    "оферт": 2,
+    "requisites": 10,
+    "contact": 8,
+    "about": 6,
+}
+PATH_KEYWORDS = {
+    "rekvizit": 10,
+    "requisit": 10,
+    "details": 4,
+    "contact": 8,
+    "kontakt": 8,
+    "about": 6,
+    "o-kompanii": 6,
+    "company": 3,
+    "privacy": 2,
+    "policy": 2,
+    "oferta": 2,
+}
+SKIP_EXT = re.compile(
+    r"\.(?:pdf|jpe?g|png|gif|svg|webp|ico|css|js|zip|rar|7z|docx?|xlsx?|pptx?|mp4|mp3|avi|woff2?|ttf)$",
+    re.I,
+)
+TRACKING_PARAMS = {
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "utm_referrer", "yclid", "gclid", "fbclid", "ref",
+}
+
+
+def canonicalize_url(url):
+    """Схема/хост в нижнем регистре, без www, якоря, utm и завершающего слэша."""
+    p = urlparse(url)
+    host = p.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"/{2,}", "/", p.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(p.query) if k.lower() not in TRACKING_PARAMS
+    ))
+    return urlunparse((p.scheme.lower(), host, path, "", query, ""))
+
+
+def same_site(url, root):
+    a = urlparse(url).netloc.lower()
+    b = urlparse(root).netloc.lower()
+    return a.removeprefix("www.") == b.removeprefix("www.")
+
+
+def score_link(url, anchor):
+    anchor = (anchor or "").lower()
+    path = urlparse(url).path.lower()
+    score = 0
+    for kw, w in ANCHOR_KEYWORDS.items():
+        if kw in anchor:
+            score = max(score, w)
+    for kw, w in PATH_KEYWORDS.items():
+        if kw in path:
+            score = max(score, w)
+    # Короткие пути обычно служебные страницы верхнего уровня
+    depth = path.strip("/").count("/")
+    return score - depth
+
+
+def extract_links(soup, page_url, root):
+    """(url, score) для ссылок того же сайта, без файлов и якорей."""
+    out = []
+    for a in soup.select("a[href]"):
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        url = urldefrag(urljoin(page_url, href))[0]
+        if not url.startswith(("http://", "https://")) or not same_site(url, root):
+            continue
+        if SKIP_EXT.search(urlparse(url).path):
+            continue
+        out.append((url, score_link(url, a.get_text(" ", strip=True))))
+    return out
+
+
+def read_limited(r, limit, chunk_size=64 * 1024):
+    """Тело потокового ответа, но не больше limit + одного куска."""
+    content = b""
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        content += chunk
+        if len(content) > limit:
+            break
+    return content
+
+
+def crawl_site(root, fetch, start_soup=None, max_pages=4, max_bytes=3_000_000,
+               min_score=1, stop=None):
+    """
+    Генератор (url, html, soup) по страницам сайта в порядке приоритета.
+
+    fetch(url) -> requests.Response | None, открытый с stream=True: не-HTML
+    и страницы больше остатка max_bytes отсекаются по заголовкам, тело
+    читается не дальше этого остатка. Главная (root) считается уже
+    скачанной и передаётся в start_soup. stop() -> True прерывает обход.
+    Ссылки с оценкой ниже min_score в очередь не попадают — «случайные»
+    страницы не стоят запроса.
+    """
+    seen = {canonicalize_url(root)}
+    frontier = []  # (-score, order, url)
+    order = 0
+
+    def push(links):
+        nonlocal order
+        for url, score in links:
+            key = canonicalize_url(url)
+            if score < min_score or key in seen:
+                continue
+            seen.add(key)
+            heapq.heappush(frontier, (-score, order, url))
+            order += 1
+
+    if start_soup is not None:
+        push(extract_links(start_soup, root, root))
+
+    pages, spent = 0, 0
+    while frontier and pages < max_pages and spent < max_bytes:
+        if stop and stop():
+            return
+        _, _, url = heapq.heappop(frontier)
+        r = fetch(url)
+        pages += 1
+        if not r:
+            continue
+        with r:
+            ctype = r.headers.get("Content-Type", "")
+            budget = max_bytes - spent
+            if (ctype and "html" not in ctype) or int(r.headers.get("Content-Length") or 0) > budget:
+                continue
+            content = read_limited(r, budget)
+            host = urlparse(r.url).hostname or ""
+        spent += len(content)
+        if len(content) > budget:
+            continue  # обрезанную страницу не разбираем, бюджет исчерпан
+        html, _ = decode_bytes(content, ctype, host)
+        soup = BeautifulSoup(html, "html.parser")
+        push(extract_links(soup, url, root))
+        yield url, html, soup
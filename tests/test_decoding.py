@@ -0,0 +1,65 @@
+import codecs
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils import decoding
+from utils.decoding import decode_bytes
+
+TEXT = "г. Москва, ул. Тверская"
+HOST = "example.ru"
+
+
+@pytest.fixture(autouse=True)
+def clean_host_cache():
+    decoding.HOST_ENCODINGS.clear()
+    yield
+    decoding.HOST_ENCODINGS.clear()
+
+
+def test_bom_wins_over_header():
+    text, enc = decode_bytes(codecs.BOM_UTF8 + TEXT.encode(), "text/html; charset=windows-1251")
+    assert (text, enc) == (TEXT, "utf-8-sig")
+
+
+def test_header_charset():
+    assert decode_bytes(TEXT.encode("cp1251"), "text/html; charset=windows-1251") == (TEXT, "cp1251")
+
+
+def test_meta_charset():
+    body = f'<meta charset="koi8-r"><p>{TEXT}</p>'.encode("koi8-r")
+    text, enc = decode_bytes(body, "text/html")
+    assert enc == "koi8-r" and TEXT in text
+
+
+def test_host_cache_does_not_override_utf8():
+    decode_bytes(TEXT.encode("cp1251"), "text/html; charset=windows-1251", HOST)
+    assert decoding.HOST_ENCODINGS[HOST] == "cp1251"
+    body = ('{"address": "%s"}' % TEXT).encode()
+    assert decode_bytes(body, "application/json", HOST)[0] == '{"address": "%s"}' % TEXT
+    assert decode_bytes(body, "", HOST) == ('{"address": "%s"}' % TEXT, "utf-8")
+
+
+def test_host_cache_before_detector(monkeypatch):
+    decode_bytes(TEXT.encode("koi8-r"), "text/html; charset=koi8-r", HOST)
+    monkeypatch.setattr(decoding, "detect_sample", lambda content: pytest.fail("detector called"))
+    assert decode_bytes(TEXT.encode("koi8-r"), "text/html", HOST) == (TEXT, "koi8-r")
+
+
+def test_detector_then_cp1251(monkeypatch):
+    monkeypatch.setattr(decoding, "detect_sample", lambda content: "koi8-r")
+    assert decode_bytes(TEXT.encode("koi8-r")) == (TEXT, "koi8-r")
+    monkeypatch.setattr(decoding, "detect_sample", lambda content: None)
+    assert decode_bytes(TEXT.encode("cp1251")) == (TEXT, "cp1251")
+
+
+def test_false_utf8_declaration_falls_back_to_cp1251():
+    assert decode_bytes(TEXT.encode("cp1251"), "text/html; charset=utf-8") == (TEXT, "cp1251")
+
+
+def test_utf8_not_cached_per_host():
+    decode_bytes(TEXT.encode(), "text/html", HOST)
+    assert HOST not in decoding.HOST_ENCODINGS
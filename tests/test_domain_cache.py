@@ -0,0 +1,38 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.domain_cache import DomainCache, canonical_domain
+
+
+def test_empty_result_is_retried_and_not_saved(tmp_path):
+    path = tmp_path / "domains.json"
+    cache = DomainCache(path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {} if len(calls) == 1 else {"inn": "7707083893"}
+
+    assert cache.get_or_compute("example.ru", compute) == ({}, False)
+    cache.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == {}
+    assert cache.get_or_compute("example.ru", compute) == ({"inn": "7707083893"}, False)
+    assert cache.get_or_compute("example.ru", compute) == ({"inn": "7707083893"}, True)
+    assert len(calls) == 2
+
+
+def test_empty_results_in_old_file_are_dropped(tmp_path):
+    path = tmp_path / "domains.json"
+    path.write_text(json.dumps({"dead.ru": {}, "ok.ru": {"inn": "7707083893"}}), encoding="utf-8")
+    assert DomainCache(path).results == {"ok.ru": {"inn": "7707083893"}}
+
+
+def test_canonical_domain_keeps_subdomains():
+    assert canonical_domain("https://www.Shop.Example.ru:8080/path?utm=1") == "shop.example.ru"
+    assert canonical_domain("example.ru/contacts") == "example.ru"
+    assert canonical_domain("orange.co.ru") == "orange.co.ru"
+    assert canonical_domain("a.tilda.ws") != canonical_domain("b.tilda.ws")
+    assert canonical_domain("http://127.0.0.1:8000/x") == "127.0.0.1"
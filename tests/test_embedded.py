@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC / "parsers"))
+sys.path.insert(0, str(SRC))
+
+from bs4 import BeautifulSoup
+
+import INN_OGRN_finding as enrich
+from utils.company_record import CompanyRecord
+
+SITE = "http://example.ru/"
+
+
+def parse(state):
+    html = f'<html><script id="__NEXT_DATA__" type="application/json">{state}</script></html>'
+    record = CompanyRecord(name="example", site=SITE)
+    enrich.parse_embedded_data(BeautifulSoup(html, "html.parser"), html, SITE, SITE, record)
+    return record
+
+
+def test_ids_and_timestamps_are_not_requisites():
+    record = parse('{"id": "5012345678", "updatedAt": "1718000000000", '
+                   '"note": "звоните +7 495 123-45-67"}')
+    assert record.inn == ""
+    assert record.ogrn == ""
+    assert record.doc_type == ""
+    assert record.contacts == "+7 495 123-45-67"
+
+
+def test_key_matched_requisites():
+    record = parse('{"company": {"inn": "7707083893", "ogrn": "1027700132195"}}')
+    assert (record.inn, record.ogrn, record.doc_type) == ("7707083893", "1027700132195", "embedded")
@@ -0,0 +1,50 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import export
+
+
+def write_straddling_csv(path):
+    """UTF-8 CSV, в котором двухбайтовая «Ж» разрезана границей SNIFF_BYTES."""
+    header = "name,region,revenue\n"
+    # "Ж" начинается на последнем байте окна: header + filler + ",,\n"
+    filler = "x" * (export.SNIFF_BYTES - 1 - len(header.encode()) - len(",,\n"))
+    body = f"{filler},,\nЖ,Москва,986900000.0\n"
+    path.write_text(header + body, encoding="utf-8")
+    raw = path.read_bytes()
+    assert raw[export.SNIFF_BYTES - 1:export.SNIFF_BYTES + 1] == "Ж".encode()
+
+
+def test_sniff_csv_utf8_char_across_boundary(tmp_path):
+    src = tmp_path / "in.csv"
+    write_straddling_csv(src)
+    assert export.sniff_csv(src) == ("utf-8", ",")
+
+
+def test_sniff_csv_cp1251(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_bytes("name;region\nЛБЛ;Москва\n".encode("cp1251"))
+    assert export.sniff_csv(src) == ("cp1251", ";")
+
+
+def test_export_utf8_input_across_boundary(tmp_path):
+    src = tmp_path / "in.csv"
+    write_straddling_csv(src)
+    columns = [("name", "name", None), ("revenue,  млн.руб", "revenue", "mln")]
+    written = export.export(src, tmp_path / "out", formats=("csv",), columns=columns)
+    with open(written["csv"], encoding="cp1251", newline="") as f:
+        rows = list(csv.DictReader(f, delimiter=";"))
+    assert rows[-1] == {"name": "Ж", "revenue,  млн.руб": "986,9"}
+
+
+def test_export_keeps_curated_final_file(tmp_path):
+    src = tmp_path / "in.csv"
+    write_straddling_csv(src)
+    curated = tmp_path / "companies_final.csv"
+    curated.write_bytes(b"curated")
+    written = export.export(src, tmp_path, formats=("csv", "jsonl"))
+    assert curated.read_bytes() == b"curated"
+    assert curated not in written.values()
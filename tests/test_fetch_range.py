@@ -0,0 +1,63 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC / "parsers"))
+sys.path.insert(0, str(SRC))
+
+import INN_OGRN_finding as enrich
+
+BODY = b"%PDF-1.4\n" + b"x" * (16 * 1024 * 1024)
+
+
+class Handler(BaseHTTPRequestHandler):
+    sent = {}  # path -> байт отдано, когда ответ закончен или оборван
+    done = threading.Event()
+
+    def do_GET(self):
+        body, status = BODY, 200
+        rng = self.headers.get("Range")
+        if self.path == "/ranges.pdf" and rng:
+            start, end = map(int, rng.removeprefix("bytes=").split("-"))
+            body, status = BODY[start:end + 1], 206
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        written = 0
+        try:
+            for i in range(0, len(body), 64 * 1024):
+                self.wfile.write(body[i:i + 64 * 1024])
+                written += len(body[i:i + 64 * 1024])
+        except OSError:
+            pass  # клиент закрыл соединение
+        finally:
+            Handler.sent[self.path] = written
+            Handler.done.set()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_range_honoured(server):
+    assert enrich.fetch_range(server + "/ranges.pdf", 0, 1023, timeout=5) == BODY[:1024]
+
+
+def test_range_ignored_is_not_downloaded(server):
+    Handler.done.clear()
+    assert enrich.fetch_range(server + "/no-ranges.pdf", 0, 1023, timeout=5) is None
+    assert Handler.done.wait(5)
+    assert Handler.sent["/no-ranges.pdf"] < len(BODY)
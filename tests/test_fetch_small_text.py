@@ -0,0 +1,41 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC / "parsers"))
+sys.path.insert(0, str(SRC))
+
+import INN_OGRN_finding as enrich
+
+
+class Busy(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        Busy.hits += 1
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Busy)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_optional_fetch_is_not_retried(server, monkeypatch):
+    monkeypatch.setattr(enrich, "HTTP_RETRIES", 2)
+    Busy.hits = 0
+    assert enrich.fetch_small_text(server + "/api/contacts.json", 1024) is None
+    assert Busy.hits == 1
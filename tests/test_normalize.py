@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.normalize import phones_e164, region_from_city, revenue_to_int
+
+
+def test_revenue_units():
+    values = ["986,9", "986.9", "986,9 млн", "1,1 млрд", "227 300 000", "986900000.0",
+              "2 500 000,00", "", "нет данных"]
+    assert revenue_to_int(pd.Series(values)).tolist() == [
+        986_900_000, 986_900_000, 986_900_000, 1_100_000_000, 227_300_000, 986_900_000,
+        2_500_000, pd.NA, pd.NA,
+    ]
+
+
+def test_phones_found_by_pattern():
+    values = ["Тел.: +7 495 123 45 67 Факс: +7 495 765 43 21", "8 (800) 555-35-35 доб. 123",
+              "+7 (495) 789-45-42; 8 495 916-01-23", "(495) 123-45-67, +44 20 7946 0958", "2019", None]
+    assert phones_e164(pd.Series(values)).tolist() == [
+        "+74951234567; +74957654321", "+78005553535", "+74957894542; +74959160123",
+        "+74951234567; +442079460958", "", "",
+    ]
+
+
+def test_region_keeps_unmapped_cities():
+    values = ["г. Москва", "Москва, Тамбов", "мск, спб", "Новосибирск", ""]
+    assert region_from_city(pd.Series(values)).tolist() == [
+        "Москва", "Москва, Тамбов", "Москва, Санкт-Петербург", "Новосибирская область", "",
+    ]
@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.registry_index import RegistryIndex, build_index
+
+DUMP = """inn;ogrn;name;region;site
+5400000001;1025400000001;ООО "OPEN TECH";Новосибирская область;opentech.ru
+7700000002;1027700000002;ООО "ЛБЛ Проект";Москва;
+7700000003;1027700000003;ООО "Альфа";Москва;holding.ru
+7700000004;1027700000004;ООО "Бета";Москва;holding.ru
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    dump = tmp_path / "egrul.csv"
+    dump.write_text(DUMP, encoding="utf-8")
+    build_index([dump], tmp_path / "index.sqlite")
+    idx = RegistryIndex(tmp_path / "index.sqlite")
+    yield idx
+    idx.close()
+
+
+def test_other_region_is_not_a_fallback(index):
+    assert index.resolve(name="OPEN TECH", region="Москва") is None
+
+
+def test_name_must_match_whole_token_set(index):
+    assert index.resolve(name="OPEN Group", region="Новосибирская область") is None
+    assert index.resolve(name="OPEN Group", region="Москва") is None
+
+
+def test_name_needs_region_or_domain(index):
+    assert index.resolve(name="ЛБЛ Проект") is None
+    assert index.resolve(name="ЛБЛ Проект", region="г. Москва")["inn"] == "7700000002"
+    assert index.resolve(name="Бета", site="https://www.holding.ru/")["inn"] == "7700000004"
+
+
+def test_unique_domain(index):
+    assert index.resolve(site="opentech.ru")["inn"] == "5400000001"
+
+
+def test_common_word_over_many_rows(tmp_path):
+    dump = tmp_path / "egrul.csv"
+    rows = [f"77{i:08d};1027700{i:06d};ООО \"Агентство {i}\";Москва;" for i in range(40_000)]
+    rows.append('7799999999;1027799999999;ООО "Агентство";Москва;')
+    dump.write_text("inn;ogrn;name;region;site\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    build_index([dump], tmp_path / "index.sqlite")
+    idx = RegistryIndex(tmp_path / "index.sqlite")
+    try:
+        assert idx.resolve(name="Агентство", region="Москва")["inn"] == "7799999999"
+    finally:
+        idx.close()
+
+
+def test_cp1251_dump(tmp_path):
+    dump = tmp_path / "egrul.csv"
+    dump.write_text("ИНН;ОГРН;Сокращенное наименование;Регион\n"
+                    "7700000002;1027700000002;ООО \"ЛБЛ Проект\";Москва\n", encoding="cp1251")
+    build_index([dump], tmp_path / "index.sqlite")
+    idx = RegistryIndex(tmp_path / "index.sqlite")
+    try:
+        assert idx.resolve(name="ЛБЛ Проект", region="Москва")["inn"] == "7700000002"
+    finally:
+        idx.close()
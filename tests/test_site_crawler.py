@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.site_crawler import crawl_site
+
+ROOT = "http://example.ru/"
+HOME = ('<a href="/contacts">Контакты</a><a href="/rekvizity">Реквизиты</a>'
+        '<a href="/about">О компании</a>')
+
+
+class StreamedResponse:
+    """Минимум requests.Response с stream=True; считает прочитанные байты."""
+
+    def __init__(self, url, body, ctype="text/html; charset=utf-8", length=True):
+        self.url = url
+        self.body = body
+        self.headers = {"Content-Type": ctype}
+        if length:
+            self.headers["Content-Length"] = str(len(body))
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            self.read += chunk_size
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+def crawl(pages, max_bytes):
+    responses = {}
+
+    def fetch(url):
+        body, kw = pages[url]
+        responses[url] = StreamedResponse(url, body, **kw)
+        return responses[url]
+
+    got = [url for url, _, _ in crawl_site(ROOT, fetch, BeautifulSoup(HOME, "html.parser"),
+                                           max_pages=10, max_bytes=max_bytes)]
+    return got, responses
+
+
+def test_rejects_by_headers_and_stops_at_budget():
+    pages = {
+        ROOT + "rekvizity": (b"%PDF-1.4" + b"x" * 100, {"ctype": "application/pdf"}),
+        ROOT + "contacts": ("<p>ИНН 7707083893</p>".encode(), {}),
+        ROOT + "about": (b"<p>" + b"x" * 500_000, {"length": False}),
+    }
+    got, responses = crawl(pages, max_bytes=1_000)
+    assert got == [ROOT + "contacts"]
+    assert responses[ROOT + "rekvizity"].read == 0
+    assert responses[ROOT + "about"].read <= 64 * 1024
+    assert all(r.closed for r in responses.values())
+
+
+def test_oversized_content_length_is_not_read():
+    pages = {
+        ROOT + "rekvizity": (b"<p>" + b"x" * 5_000, {}),
+        ROOT + "contacts": (b"<p>ok</p>", {}),
+        ROOT + "about": (b"<p>ok</p>", {}),
+    }
+    got, responses = crawl(pages, max_bytes=1_000)
+    assert ROOT + "rekvizity" not in got
+    assert responses[ROOT + "rekvizity"].read == 0